@@ -6,11 +6,13 @@
     'category': 'Sales',
     'author': 'Code Kenya',
     'depends': ['base', 'crm', 'account', 'base_automation', 'mail'],
+    'external_dependencies': {'python': ['numpy']},
     'data': [
         'security/security.xml',
         'security/ir.model.access.csv',
         'views/rate_table_views.xml',
         'views/policy_views.xml',
+        'views/policy_endorsement_views.xml',
         'views/quick_quote_views.xml',
         'views/import_members_views.xml',
         'reports/quote_report_new.xml',  # 
@@ -26,6 +28,8 @@
         'views/policy_masterlist.xml',
         'views/medical_benefit_views.xml',
         'views/commission_views.xml',
+        'views/insurance_report_views.xml',
+        'views/insurance_perf_log_views.xml',
         'views/portal_template.xml',
         'reports/risk_note_template.xml',
         'views/lead_quote_views.xml',
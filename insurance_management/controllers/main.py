@@ -1,5 +1,9 @@
+import tempfile
+
+from werkzeug.wsgi import wrap_file
+
 from odoo import http
-from odoo.http import request
+from odoo.http import request, content_disposition
 from odoo.exceptions import AccessError
 from odoo import fields
 
@@ -9,7 +13,33 @@ class DocumentController(http.Controller):
     def preview_risk_note(self, lead_id):
         report_name = 'insurance_management.report_medical_benefit'
         return request.redirect(f'/report/pdf/{report_name}/{lead_id}')
-    
+
+
+class MasterlistExportController(http.Controller):
+
+    @http.route('/insurance/masterlist/<int:masterlist_id>/export/<string:category>', type='http', auth='user')
+    def export_masterlist(self, masterlist_id, category):
+        """Stream a masterlist export from a temporary file instead of storing an attachment."""
+        masterlist = request.env['insurance.policy.masterlist'].browse(masterlist_id).exists()
+        if not masterlist:
+            raise request.not_found()
+        masterlist.check_access('read')
+        if category not in masterlist._get_export_categories():
+            raise request.not_found()
+
+        output = tempfile.TemporaryFile()
+        masterlist._write_export_excel(category, output)
+        size = output.tell()
+        output.seek(0)
+        return request.make_response(
+            wrap_file(request.httprequest.environ, output),
+            headers=[
+                ('Content-Type', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+                ('Content-Length', str(size)),
+                ('Content-Disposition', content_disposition(masterlist._get_export_filename(category))),
+            ],
+        )
+
 
 class QuoteUploadController(http.Controller):
     @http.route(['/innovus/quote/upload/<string:token>', '/innovus/quote/upload/<string:token>/submit'], auth='public', website=True)
@@ -2,5 +2,9 @@ from . import insurer, rate_table, rate_table_band, policy, policy_member, accou
 from . import crm_lead, crm_lead_population, cr_report
 from . import benefit
 from . import medical_benefit, lead_quote
+from . import perf_log
+from . import member_import
+from . import policy_endorsement
+from . import insurance_report
 
 
@@ -1,18 +1,70 @@
 from odoo import models, fields, api
 import logging
 
+from .perf_log import profiled
+
 _logger = logging.getLogger(__name__)
 
 class AccountMove(models.Model):
     _inherit = 'account.move'
 
     insurance_policy_id = fields.Many2one('insurance.policy', string='Related Policy', readonly=True)
+    insurance_member_line_ids = fields.One2many('insurance.invoice.member.line', 'move_id', string='Member Breakdown', readonly=True)
+
+    @profiled('_insurance_post_reconcile')
+    def _insurance_post_reconcile(self):
+        """
+        Post-reconcile stage for paid policy invoices: create their commissions with a single
+        ``create`` and sync the member states once per distinct policy, in the same transaction
+        as the payment.
+        """
+        invoices = self.filtered(
+            lambda move: move.move_type == 'out_invoice'
+            and move.insurance_policy_id
+            and move.insurance_policy_id.payment_type == 'broker'
+        )
+        if not invoices:
+            return
+        commission_vals_list = []
+        for move in invoices:
+            policy = move.insurance_policy_id
+            commission_plan = policy.commission_plan_id
+            if commission_plan:
+                commission_vals_list.append({
+                    'commission_plan_id': commission_plan.id,
+                    'policy_id': policy.id,
+                    'invoice_id': move.id,
+                    'commission_date': fields.Date.today(),
+                    'commission_amount': move.amount_total * commission_plan.commission_rate,
+                })
+        commissions = self.env['insurance.commission'].create(commission_vals_list)
+        policies = invoices.insurance_policy_id
+        policies._sync_member_states()
+        _logger.info(
+            f"{len(invoices)} invoices reconciled: {len(commissions)} commissions created "
+            f"and member states synced for {len(policies)} policies."
+        )
 
 
 class AccountMoveLine(models.Model):
     _inherit = 'account.move.line'
 
     insurance_policy_member_id = fields.Many2one('insurance.policy.member', string='Policy Member', readonly=True)
+    insurance_grouped_premium = fields.Boolean(string='Grouped Premium', readonly=True,
+                                               help="Premium line billing several members, detailed in the invoice's member breakdown.")
+
+
+class InsuranceInvoiceMemberLine(models.Model):
+    _name = 'insurance.invoice.member.line'
+    _description = 'Invoice Member Breakdown'
+
+    move_id = fields.Many2one('account.move', string='Invoice', required=True, ondelete='cascade', index=True)
+    member_id = fields.Many2one('insurance.policy.member', string='Policy Member', required=True, index=True)
+    policy_id = fields.Many2one('insurance.policy', related='move_id.insurance_policy_id', store=True, string='Policy')
+    group_label = fields.Char(string='Invoice Line', help='Band or relation type of the grouped invoice line billing this member.')
+    amount = fields.Float(string='Premium', digits=(16, 2))
+    locked_premium = fields.Float(string='Locked Premium', digits=(16, 2))
+    currency_id = fields.Many2one('res.currency', related='move_id.currency_id', readonly=True)
 
 
 
@@ -22,37 +74,11 @@ class AccountPaymentRegister(models.TransientModel):
     def _reconcile_payments(self, to_process, edit_mode=False):
         res = super()._reconcile_payments(to_process, edit_mode=edit_mode)
 
+        moves = self.env['account.move']
         for vals in to_process:
             lines = vals.get('to_reconcile')
-            if not lines:
-                continue
-
-            for move in lines.mapped('move_id'):
-                if (
-                    move.move_type == 'out_invoice'
-                    and move.insurance_policy_id
-                    and move.insurance_policy_id.payment_type == 'broker'
-                ):
-                    policy = move.insurance_policy_id
-                    commission_plan = policy.commission_plan_id
-                    if commission_plan:
-                        commission_amount = move.amount_total * commission_plan.commission_rate
-                        self.env['insurance.commission'].create({
-                            'commission_plan_id': commission_plan.id,
-                            'policy_id': policy.id,
-                            'invoice_id': move.id,
-                            'commission_date': fields.Date.today(),
-                            'commission_amount': commission_amount,
-                        })
-                        _logger.info(
-                            f"Commission created for invoice {move.name} "
-                            f"on policy {policy.name}: {commission_amount}."
-                        )
-                    move.insurance_policy_id._sync_member_states()
-                    self.env.cr.commit()
-                    _logger.info(
-                        f"Invoice {move.name} reconciled and triggered sync "
-                        f"for policy {move.insurance_policy_id.name}."
-                    )
-
-        return res
\ No newline at end of file
+            if lines:
+                moves |= lines.move_id
+        moves._insurance_post_reconcile()
+        return res
+
@@ -1,6 +1,8 @@
 from odoo import models, fields, api
 import logging
+from collections import defaultdict
 from odoo.exceptions import ValidationError
+from odoo.tools import float_compare
 
 
 _logger = logging.getLogger(__name__)
@@ -14,11 +16,24 @@ class InsuranceCommissionPlan(models.Model):
     commission_rate = fields.Float(string='Commission Rate (%)', required=True, digits=(5, 2), help='Percentage of invoice amount to be paid as commission.')
     policy_ids = fields.One2many('insurance.policy', 'commission_plan_id', string='Policies', readonly=True)
     policy_count = fields.Integer(string='Policy Count', compute='_compute_policy_count', store=True)
+    commission_ids = fields.One2many('insurance.commission', 'commission_plan_id', string='Commissions', readonly=True)
+    total_commission = fields.Float(string='Total Commission', compute='_compute_total_commission', store=True, digits=(16, 2))
 
     @api.depends('policy_ids')
     def _compute_policy_count(self):
+        counts = dict(self.env['insurance.policy']._read_group(
+            [('commission_plan_id', 'in', self.ids)], ['commission_plan_id'], ['__count'],
+        ))
         for plan in self:
-            plan.policy_count = len(plan.policy_ids)
+            plan.policy_count = counts.get(plan, 0)
+
+    @api.depends('commission_ids.commission_amount')
+    def _compute_total_commission(self):
+        totals = dict(self.env['insurance.commission']._read_group(
+            [('commission_plan_id', 'in', self.ids)], ['commission_plan_id'], ['commission_amount:sum'],
+        ))
+        for plan in self:
+            plan.total_commission = totals.get(plan, 0.0)
 
     @api.constrains('commission_rate')
     def _check_commission_rate(self):
@@ -51,4 +66,50 @@ class InsuranceCommission(models.Model):
     invoice_id = fields.Many2one('account.move', string='Source Invoice', required=True, readonly=True, domain=[('move_type', '=', 'out_invoice')])
     commission_date = fields.Date(string='Commission Date', required=True, readonly=True, default=fields.Date.today)
     commission_amount = fields.Float(string='Commission Achieved', readonly=True, digits=(16, 2))
-    currency_id = fields.Many2one('res.currency', related='policy_id.insurer_id.currency_id', readonly=True)
\ No newline at end of file
+    currency_id = fields.Many2one('res.currency', related='policy_id.insurer_id.currency_id', readonly=True)
+
+    @api.model
+    def _compute_commissions(self, date_from, date_to, plans=None):
+        """
+        (Re)compute the commissions of paid broker invoices dated between ``date_from`` and
+        ``date_to``: missing commissions are created with one ``create`` and amounts that no
+        longer match the policy's plan rate are corrected with one write per amount.
+        Returns the commissions created or updated.
+        """
+        domain = [
+            ('move_type', '=', 'out_invoice'),
+            ('payment_state', '=', 'paid'),
+            ('insurance_policy_id.payment_type', '=', 'broker'),
+            ('insurance_policy_id.commission_plan_id', '!=', False),
+            ('invoice_date', '>=', date_from),
+            ('invoice_date', '<=', date_to),
+        ]
+        if plans:
+            domain.append(('insurance_policy_id.commission_plan_id', 'in', plans.ids))
+        invoices = self.env['account.move'].search(domain)
+        existing = {commission.invoice_id: commission for commission in self.search([('invoice_id', 'in', invoices.ids)])}
+
+        create_vals_list = []
+        corrections = defaultdict(lambda: self.browse())
+        for invoice in invoices:
+            plan = invoice.insurance_policy_id.commission_plan_id
+            amount = invoice.amount_total * plan.commission_rate
+            commission = existing.get(invoice)
+            if not commission:
+                create_vals_list.append({
+                    'commission_plan_id': plan.id,
+                    'policy_id': invoice.insurance_policy_id.id,
+                    'invoice_id': invoice.id,
+                    'commission_date': invoice.invoice_date,
+                    'commission_amount': amount,
+                })
+            elif commission.commission_plan_id != plan or float_compare(commission.commission_amount, amount, precision_digits=2):
+                corrections[(plan.id, amount)] |= commission
+
+        created = self.create(create_vals_list)
+        updated = self.browse()
+        for (plan_id, amount), commissions in corrections.items():
+            commissions.write({'commission_plan_id': plan_id, 'commission_amount': amount})
+            updated |= commissions
+        _logger.info(f"Commission backfill {date_from} - {date_to}: {len(created)} created, {len(updated)} corrected.")
+        return created | updated
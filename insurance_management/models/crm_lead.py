@@ -4,6 +4,8 @@ from odoo.exceptions import ValidationError, UserError
 from odoo.tools.translate import _
 from datetime import datetime, timedelta
 import base64
+import hashlib
+import json
 from io import BytesIO
 import logging
 
@@ -11,6 +13,8 @@ import logging
 
 _logger = logging.getLogger(__name__)
 
+RFQ_ALERT_DAYS = [5, 4, 3, 1]
+
 
 class CrmLead(models.Model):
     _inherit = "crm.lead"
@@ -119,9 +123,15 @@ class CrmLead(models.Model):
 
 
     # Fields for risk note and quote management
-    rfq_deadline = fields.Date('RFQ Deadline')
+    rfq_deadline = fields.Date('RFQ Deadline', index=True)
+    rfq_alert_sent_date = fields.Date(string='Last RFQ Reminder', readonly=True, copy=False,
+                                      help='Date the last RFQ deadline reminder was queued for this lead.')
     risk_note_document = fields.Binary(string='Risk Note Document')
     risk_note_document_filename = fields.Char(string='Risk Note Filename')
+    risk_note_hash = fields.Char(string='Risk Note Fingerprint', readonly=True, copy=False,
+                                 help='Hash of the content rendered in the current risk note document.')
+    risk_note_attachment_id = fields.Many2one('ir.attachment', string='Risk Note Attachment', readonly=True, copy=False,
+                                              help='Attachment of the current risk note, shared by every quote request.')
     quote_ids = fields.One2many('lead.quote', 'lead_id', string='Quotes')
     bd_handler_id = fields.Many2one('res.users', string='BD Handler')
 
@@ -136,10 +146,15 @@ class CrmLead(models.Model):
         except ValueError:
             raise UserError(_("Risk note report is not configured. Please ensure the report is installed."))
 
-        # Generate PDF
-        pdf_content, _ = self.env['ir.actions.report']._render_qweb_pdf(report.report_name, res_ids=[self.id])
-        self.risk_note_document = base64.b64encode(pdf_content)
-        self.risk_note_document_filename = f"Risk_Note_{self.name}_{fields.Date.today()}.pdf"
+        # Generate PDF, unless the risk note content is unchanged since the last render
+        fingerprint = self._get_risk_note_fingerprint()
+        if not self.risk_note_document or self.risk_note_hash != fingerprint:
+            pdf_content, _report_type = self.env['ir.actions.report']._render_qweb_pdf(report.report_name, res_ids=[self.id])
+            self.risk_note_document = base64.b64encode(pdf_content)
+            self.risk_note_document_filename = f"Risk_Note_{self.name}_{fields.Date.today()}.pdf"
+            self.risk_note_hash = fingerprint
+        else:
+            _logger.info("Risk note of lead %s is unchanged, reusing the previous PDF.", self.id)
 
         # Ensure RFQ deadline
         if not self.rfq_deadline:
@@ -160,6 +175,43 @@ class CrmLead(models.Model):
 
         return True
 
+    def _prefetch_risk_note_data(self):
+        """Load the benefit tree, rate table bands and populations of the leads with one query per level."""
+        benefits = self.medical_benefit_ids.benefit_id
+        benefits.mapped('special_exclusion')
+        benefits.benefit_line_ids.benefit_scope_ids.mapped('name')
+        benefits.rate_table_id.band_ids.mapped('band_label')
+        self.lead_population_ids.mapped('band_total')
+        self.partner_id.category_id.mapped('name')
+
+    def _get_risk_note_fingerprint(self):
+        """Hash of everything the risk note renders: the lead, client, benefits, populations and rate tables."""
+        self.ensure_one()
+        self._prefetch_risk_note_data()
+        partner = self.partner_id
+        payload = {
+            'lead': [self.name, self.create_date, self.bd_handler_id.name, self.rfq_deadline, self.underwriter_id.name],
+            'partner': [
+                partner.name, partner.id_no, partner.street, partner.city, partner.zip,
+                partner.country_id.name, partner.phone, partner.email, partner.category_id.mapped('name'),
+            ],
+            'benefits': [[
+                benefit.benefit_id.name,
+                benefit.benefit_id.special_exclusion,
+                benefit.benefit_id.rate_table_id.name,
+                sorted(benefit.benefit_id.rate_table_id._get_band_premiums().items()) if benefit.benefit_id.rate_table_id else [],
+                [[
+                    line.benefit, line.benefit_limit, line.scope, line.type, line.admin,
+                    [[scope.name, scope.limit, scope.scope] for scope in line.benefit_scope_ids],
+                ] for line in benefit.benefit_id.benefit_line_ids],
+            ] for benefit in self.medical_benefit_ids],
+            'population': [
+                [pop.dependent_count, pop.family_count, pop.inpatient_premium, pop.outpatient_premium]
+                for pop in self.lead_population_ids
+            ],
+        }
+        return hashlib.sha256(json.dumps(payload, default=str).encode()).hexdigest()
+
     def action_send_quote_request(self):
         """Send quote request emails with upload links to underwriters."""
         self.ensure_one()
@@ -171,41 +223,99 @@ class CrmLead(models.Model):
         if not underwriters:
             raise ValidationError(("No underwriters with valid email addresses found. Please configure underwriters in Contacts."))
 
+        self._send_quote_requests(underwriters)
+        self.message_post(body=_("Quote requests sent to %s underwriters.") % len(underwriters))
+
+    def _send_quote_requests(self, underwriters):
+        """
+        Create one quote per underwriter in a single batch and queue the quote request emails.
+        The risk note is attached once and shared by every email, and sending is left to the
+        mail queue so the user's request does not wait on SMTP.
+        """
+        self.ensure_one()
+        quotes = self.env['lead.quote'].create([{
+            'lead_id': self.id,
+            'partner_id': underwriter.id,
+            'state': 'submitted',
+        } for underwriter in underwriters])
+        attachment = self._get_risk_note_attachment()
         template = self.env.ref('insurance_management.email_template_quote_request')
-        for underwriter in underwriters:
-            # Create a quote record with token
-            quote = self.env['lead.quote'].create({
-                'lead_id': self.id,
-                'partner_id': underwriter.id,
-                'state': 'submitted',
+        mails = template.send_mail_batch(quotes.ids, force_send=False)
+        if attachment:
+            mails.write({'attachment_ids': [(4, attachment.id)]})
+        # Wake the mail queue up instead of waiting for its next scheduled run
+        self.env.ref('mail.ir_cron_mail_scheduler_action')._trigger()
+        _logger.info("Queued %s quote request emails for lead %s.", len(quotes), self.id)
+        return quotes
+
+    def _get_risk_note_attachment(self):
+        """
+        Attachment holding the lead's risk note, shared by the quote request emails.
+        It is addressed by checksum: every send and resend of the same PDF reuses one
+        attachment linked to the lead, and only a new PDF creates a new one.
+        """
+        self.ensure_one()
+        if not self.risk_note_document:
+            return self.env['ir.attachment']
+        Attachment = self.env['ir.attachment'].sudo()
+        # The binary field is itself stored as an attachment, whose checksum avoids decoding the PDF
+        document = Attachment.search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'risk_note_document'),
+            ('res_id', '=', self.id),
+        ], limit=1)
+        checksum = document.checksum if document else Attachment._compute_checksum(base64.b64decode(self.risk_note_document))
+        if self.risk_note_attachment_id.checksum == checksum:
+            return self.risk_note_attachment_id
+        attachment = self.env['ir.attachment'].search([
+            ('res_model', '=', self._name),
+            ('res_id', '=', self.id),
+            ('checksum', '=', checksum),
+        ], limit=1)
+        if not attachment:
+            attachment = self.env['ir.attachment'].create({
+                'name': self.risk_note_document_filename or 'Risk_Note.pdf',
+                'raw': document.raw if document else base64.b64decode(self.risk_note_document),
+                'res_model': self._name,
+                'res_id': self.id,
+                'type': 'binary',
+                'mimetype': 'application/pdf',
             })
-            # Send email with upload link
-            upload_url = f"{self.get_base_url()}/innovus/quote/upload/{quote.access_token}"
-            template.with_context(
-                upload_url=upload_url,
-                underwriter_name=underwriter.name
-            ).send_mail(
-                self.id,
-                force_send=True,
-                email_values={
-                    'email_to': underwriter.email,
-                    'attachment_ids': [(0, 0, {
-                        'name': self.risk_note_document_filename,
-                        'datas': self.risk_note_document,
-                        'mimetype': 'application/pdf'
-                    })]
-                }
-            )
-        self.message_post(body=_("Quote requests sent to %s underwriters.") % len(underwriters))
+        self.risk_note_attachment_id = attachment
+        return attachment
 
     @api.model
     def _cron_rfq_deadline_alerts(self):
-        """Send RFQ deadline reminders."""
+        """
+        Queue RFQ deadline reminders for leads due in exactly 5, 4, 3 or 1 days. Only those
+        leads are fetched, through the index on ``rfq_deadline``, and leads already reminded
+        today are skipped so that a re-run does not send twice.
+        """
         today = fields.Date.today()
-        alerts = self.search([('rfq_deadline', '!=', False)])
-        for lead in alerts:
-            if lead.rfq_deadline:
-                days_left = (lead.rfq_deadline - today).days
-                if days_left in [5, 4, 3, 1]:
-                    template = self.env.ref('insurance_management.email_template_rfq_alert')
-                    template.send_mail(lead.id, force_send=True)
\ No newline at end of file
+        leads = self.search([
+            ('rfq_deadline', 'in', [today + timedelta(days=days) for days in RFQ_ALERT_DAYS]),
+            '|', ('rfq_alert_sent_date', '=', False), ('rfq_alert_sent_date', '<', today),
+        ])
+        if not leads:
+            return
+        template = self.env.ref('insurance_management.email_template_rfq_alert')
+        template.send_mail_batch(leads.ids, force_send=False)
+        leads.write({'rfq_alert_sent_date': today})
+        _logger.info("Queued RFQ deadline reminders for %s leads.", len(leads))
+
+
+class ReportRiskNote(models.AbstractModel):
+    _name = 'report.insurance_management.report_risk_note_document'
+    _description = 'Risk Note Report'
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        docs = self.env['crm.lead'].browse(docids)
+        # Load the whole benefit tree before QWeb walks it record by record
+        docs._prefetch_risk_note_data()
+        return {
+            'doc_ids': docids,
+            'doc_model': 'crm.lead',
+            'docs': docs,
+            'data': data,
+        }
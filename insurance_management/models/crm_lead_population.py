@@ -9,8 +9,8 @@ class CrmLeadPopulation(models.Model):
     lead_id = fields.Many2one('crm.lead')
     dependent_count = fields.Integer(default=0)
     family_count = fields.Integer(default=0)
-    inpatient_premium = fields.Float(default=0.0,compute='_compute_inpatient_premium')
-    outpatient_premium = fields.Float(default=0.0,compute='_compute_outpatient_premium')
+    inpatient_premium = fields.Float(default=0.0,compute='_compute_band_premiums')
+    outpatient_premium = fields.Float(default=0.0,compute='_compute_band_premiums')
     band_total = fields.Float(default=0.0, compute='_compute_band_total')
     band_label = fields.Char(string='Band', compute='_compute_band_label', store=True)
 
@@ -21,21 +21,17 @@ class CrmLeadPopulation(models.Model):
             rec.band_label = 'M' if rec.dependent_count == 0 else f'M+{rec.dependent_count}'
 
 
-    @api.depends('lead_id')
-    def _compute_inpatient_premium(self):
-        """Compute inpatient premium based on dependent count."""
-        rate_table_id = self.lead_id.rate_table_id
-        if rate_table_id:
-            for rec in self:
-                rec.inpatient_premium = rate_table_id.get_inpatient_premium(rec.dependent_count)*rec.family_count
-
-    @api.depends('lead_id')
-    def _compute_outpatient_premium(self):
-        """Compute outpatient premium based on dependent count."""
-        rate_table_id = self.lead_id.rate_table_id
-        if rate_table_id:
-            for rec in self:
-                rec.outpatient_premium = rate_table_id.get_outpatient_premium(rec.dependent_count)*rec.family_count
+    @api.depends('lead_id', 'lead_id.rate_table_id', 'dependent_count', 'family_count')
+    def _compute_band_premiums(self):
+        """Price all populations of a rate table with one band index lookup."""
+        for rate_table, populations in self.grouped(lambda p: p.lead_id.rate_table_id).items():
+            if not rate_table:
+                populations.inpatient_premium = populations.outpatient_premium = 0.0
+                continue
+            premiums = rate_table.get_premiums(populations.mapped('dependent_count'))
+            for rec, (inpatient, outpatient) in zip(populations, premiums):
+                rec.inpatient_premium = inpatient * rec.family_count
+                rec.outpatient_premium = outpatient * rec.family_count
 
     @api.depends('inpatient_premium', 'outpatient_premium')
     def _compute_band_total(self):
@@ -0,0 +1,180 @@
+from odoo import models, fields, tools
+
+# Premium of every posted policy invoice and credit note per band, signed like
+# amount_untaxed_signed. Lines billing one member take the member's family band; grouped
+# premium lines are replaced by their member breakdown so they can be split per band too.
+INVOICE_BAND_LINES_QUERY = """
+    SELECT
+        l.move_id AS move_id,
+        COALESCE(m.band_label, principal.band_label) AS band_label,
+        SUM(l.amount) AS amount
+    FROM (
+        SELECT aml.move_id, aml.insurance_policy_member_id AS member_id, -aml.balance AS amount
+        FROM account_move_line aml
+        JOIN account_move am ON am.id = aml.move_id
+        WHERE am.insurance_policy_id IS NOT NULL
+          AND aml.display_type = 'product'
+          AND NOT COALESCE(aml.insurance_grouped_premium, FALSE)
+        UNION ALL
+        SELECT iml.move_id, iml.member_id,
+               CASE WHEN am.move_type = 'out_refund' THEN -iml.amount ELSE iml.amount END AS amount
+        FROM insurance_invoice_member_line iml
+        JOIN account_move am ON am.id = iml.move_id
+    ) l
+    LEFT JOIN insurance_policy_member m ON m.id = l.member_id
+    LEFT JOIN insurance_policy_member principal ON principal.id = m.principal_member_id
+    GROUP BY l.move_id, COALESCE(m.band_label, principal.band_label)
+"""
+
+
+class InsuranceMemberReport(models.Model):
+    """Member counts and premiums per insurer, plan, month and band, read from a SQL view."""
+    _name = 'insurance.report.member'
+    _description = 'Insurance Member Analysis'
+    _auto = False
+    _rec_name = 'date'
+    _order = 'date desc'
+
+    date = fields.Date(string='Month', readonly=True)
+    member_id = fields.Many2one('insurance.policy.member', string='Member', readonly=True)
+    policy_id = fields.Many2one('insurance.policy', string='Policy', readonly=True)
+    partner_id = fields.Many2one('res.partner', string='Client', readonly=True)
+    insurer_id = fields.Many2one('res.partner', string='Insurer', readonly=True)
+    commission_plan_id = fields.Many2one('insurance.commission.plan', string='Commission Plan', readonly=True)
+    band_label = fields.Char(string='Band', readonly=True)
+    relation_type = fields.Selection([
+        ('principal', 'Principal'),
+        ('spouse', 'Spouse'),
+        ('child', 'Child'),
+        ('newborn', 'Newborn'),
+        ('other', 'Other'),
+    ], string='Relation Type', readonly=True)
+    state = fields.Selection([('pending', 'Pending'), ('active', 'Active'), ('deleted', 'Deleted')], string='Status', readonly=True)
+    member_count = fields.Integer(string='# Members', readonly=True, aggregator='sum')
+    premium = fields.Float(string='Premium', readonly=True, digits=(16, 2), aggregator='sum')
+    locked_premium = fields.Float(string='Locked Premium', readonly=True, digits=(16, 2), aggregator='sum')
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(f"""
+            CREATE OR REPLACE VIEW {self._table} AS (
+                SELECT
+                    m.id AS id,
+                    m.id AS member_id,
+                    p.id AS policy_id,
+                    p.partner_id AS partner_id,
+                    p.insurer_id AS insurer_id,
+                    p.commission_plan_id AS commission_plan_id,
+                    date_trunc('month', COALESCE(m.activation_date, m.creation_date, m.create_date))::date AS date,
+                    -- Dependents are reported under their family's band
+                    COALESCE(m.band_label, principal.band_label) AS band_label,
+                    m.relation_type AS relation_type,
+                    m.state AS state,
+                    1 AS member_count,
+                    m.premium AS premium,
+                    m.locked_premium AS locked_premium
+                FROM insurance_policy_member m
+                JOIN insurance_policy p ON p.id = COALESCE(m.policy_id, m.deleted_policy_id)
+                LEFT JOIN insurance_policy_member principal ON principal.id = m.principal_member_id
+            )
+        """)
+
+
+class InsuranceInvoiceReport(models.Model):
+    """Premium written per insurer, plan, month and band, from posted policy invoices and credit notes."""
+    _name = 'insurance.report.invoice'
+    _description = 'Insurance Premium Written Analysis'
+    _auto = False
+    _rec_name = 'date'
+    _order = 'date desc'
+
+    date = fields.Date(string='Invoice Date', readonly=True)
+    move_id = fields.Many2one('account.move', string='Invoice', readonly=True)
+    move_type = fields.Selection([('out_invoice', 'Invoice'), ('out_refund', 'Credit Note')], string='Type', readonly=True)
+    payment_state = fields.Char(string='Payment Status', readonly=True)
+    policy_id = fields.Many2one('insurance.policy', string='Policy', readonly=True)
+    partner_id = fields.Many2one('res.partner', string='Client', readonly=True)
+    insurer_id = fields.Many2one('res.partner', string='Insurer', readonly=True)
+    commission_plan_id = fields.Many2one('insurance.commission.plan', string='Commission Plan', readonly=True)
+    band_label = fields.Char(string='Band', readonly=True)
+    premium_written = fields.Float(string='Premium Written', readonly=True, digits=(16, 2), aggregator='sum')
+    invoice_count = fields.Integer(string='# Invoices', readonly=True, aggregator='sum')
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(f"""
+            CREATE OR REPLACE VIEW {self._table} AS (
+                WITH band_lines AS ({INVOICE_BAND_LINES_QUERY})
+                SELECT
+                    row_number() OVER (ORDER BY am.id, bl.band_label) AS id,
+                    am.id AS move_id,
+                    am.move_type AS move_type,
+                    am.payment_state AS payment_state,
+                    am.invoice_date AS date,
+                    p.id AS policy_id,
+                    p.partner_id AS partner_id,
+                    p.insurer_id AS insurer_id,
+                    p.commission_plan_id AS commission_plan_id,
+                    bl.band_label AS band_label,
+                    -- Credit notes are signed negative
+                    COALESCE(bl.amount, am.amount_untaxed_signed) AS premium_written,
+                    -- Each invoice is counted once, on its first band
+                    CASE WHEN row_number() OVER (PARTITION BY am.id ORDER BY bl.band_label) = 1 THEN 1 ELSE 0 END AS invoice_count
+                FROM account_move am
+                JOIN insurance_policy p ON p.id = am.insurance_policy_id
+                LEFT JOIN band_lines bl ON bl.move_id = am.id
+                WHERE am.state = 'posted'
+                  AND am.move_type IN ('out_invoice', 'out_refund')
+            )
+        """)
+
+
+class InsuranceCommissionReport(models.Model):
+    """
+    Commissions earned per insurer, plan, month and band, with the premium of their source
+    invoices. A commission is split over the bands of its invoice pro rata of their premium.
+    """
+    _name = 'insurance.report.commission'
+    _description = 'Insurance Commission Analysis'
+    _auto = False
+    _rec_name = 'date'
+    _order = 'date desc'
+
+    date = fields.Date(string='Commission Date', readonly=True)
+    commission_id = fields.Many2one('insurance.commission', string='Commission', readonly=True)
+    invoice_id = fields.Many2one('account.move', string='Source Invoice', readonly=True)
+    policy_id = fields.Many2one('insurance.policy', string='Policy', readonly=True)
+    partner_id = fields.Many2one('res.partner', string='Client', readonly=True)
+    insurer_id = fields.Many2one('res.partner', string='Insurer', readonly=True)
+    commission_plan_id = fields.Many2one('insurance.commission.plan', string='Commission Plan', readonly=True)
+    band_label = fields.Char(string='Band', readonly=True)
+    commission_amount = fields.Float(string='Commission Earned', readonly=True, digits=(16, 2), aggregator='sum')
+    invoice_amount = fields.Float(string='Invoiced Premium', readonly=True, digits=(16, 2), aggregator='sum')
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(f"""
+            CREATE OR REPLACE VIEW {self._table} AS (
+                WITH band_lines AS ({INVOICE_BAND_LINES_QUERY})
+                SELECT
+                    row_number() OVER (ORDER BY c.id, bl.band_label) AS id,
+                    c.id AS commission_id,
+                    c.invoice_id AS invoice_id,
+                    c.commission_date AS date,
+                    p.id AS policy_id,
+                    p.partner_id AS partner_id,
+                    p.insurer_id AS insurer_id,
+                    c.commission_plan_id AS commission_plan_id,
+                    bl.band_label AS band_label,
+                    c.commission_amount * COALESCE(
+                        bl.amount / NULLIF(SUM(bl.amount) OVER (PARTITION BY c.id), 0),
+                        -- Invoices without premium keep the whole commission on their first row
+                        CASE WHEN row_number() OVER (PARTITION BY c.id ORDER BY bl.band_label) = 1 THEN 1 ELSE 0 END
+                    ) AS commission_amount,
+                    COALESCE(bl.amount, am.amount_untaxed_signed) AS invoice_amount
+                FROM insurance_commission c
+                JOIN insurance_policy p ON p.id = c.policy_id
+                JOIN account_move am ON am.id = c.invoice_id
+                LEFT JOIN band_lines bl ON bl.move_id = c.invoice_id
+            )
+        """)
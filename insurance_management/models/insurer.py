@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields
+from odoo import models, fields, api
+from odoo.osv import expression
+
+MEMBER_CONTACT_KEYS = ('id_no', 'email', 'phone')
 
 class ResPartner(models.Model):
     _inherit = 'res.partner'
@@ -11,4 +14,60 @@ class ResPartner(models.Model):
         comodel_name='insurance.rate.table',
         inverse_name='insurer_id',
         string='Rate Tables'
-    )
\ No newline at end of file
+    )
+
+    @api.model
+    def _get_or_create_member_contacts(self, vals_list):
+        """
+        Resolve the contact of each member values dict in one pass. A contact matches when
+        it has every id_no/email/phone the member provides. All candidates are fetched with
+        a single query, and missing contacts are created with one ``create`` call, once per
+        distinct ID number (or email/phone when there is no ID number) in the batch.
+        Returns the contacts in the order of ``vals_list``.
+        """
+        criteria_list = [
+            tuple((key, str(vals[key])) for key in MEMBER_CONTACT_KEYS if vals.get(key))
+            for vals in vals_list
+        ]
+        values = {key: set() for key in MEMBER_CONTACT_KEYS}
+        for criteria in criteria_list:
+            for key, value in criteria:
+                values[key].add(value)
+        domain = [[(key, 'in', list(found))] for key, found in values.items() if found]
+        candidates = self.search(expression.OR(domain)) if domain else self.browse()
+
+        index = {}
+        for partner in candidates:
+            for key in MEMBER_CONTACT_KEYS:
+                if partner[key]:
+                    index.setdefault((key, partner[key]), []).append(partner)
+
+        partners = [None] * len(vals_list)
+        new_contacts = {}
+        for position, (vals, criteria) in enumerate(zip(vals_list, criteria_list)):
+            if not criteria:
+                continue
+            match = next((
+                partner for partner in index.get(criteria[0], [])
+                if all(partner[key] == value for key, value in criteria[1:])
+            ), None)
+            if match:
+                partners[position] = match
+                continue
+            dedupe_key = criteria[0] if criteria[0][0] == 'id_no' else criteria
+            new_contacts.setdefault(dedupe_key, {
+                'positions': [],
+                'vals': {
+                    'name': vals.get('name', 'New Contact'),
+                    'id_no': vals.get('id_no', False),
+                    'email': vals.get('email', False),
+                    'phone': vals.get('phone', False),
+                    'is_insurer': False,
+                },
+            })['positions'].append(position)
+
+        created = self.create([contact['vals'] for contact in new_contacts.values()])
+        for contact, partner in zip(new_contacts.values(), created):
+            for position in contact['positions']:
+                partners[position] = partner
+        return partners
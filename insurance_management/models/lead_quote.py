@@ -30,6 +30,12 @@ class LeadQuote(models.Model):
     comments = fields.Text(string='Comments')
     access_token = fields.Char(string='Access Token', readonly=True, copy=False)
     token_expiry = fields.Date(string='Token Expiry', readonly=True)
+    portal_url = fields.Char(string='Upload Link', compute='_compute_portal_url')
+
+    def _compute_portal_url(self):
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        for quote in self:
+            quote.portal_url = f"{base_url}/innovus/quote/upload/{quote.access_token}" if quote.access_token else False
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -0,0 +1,404 @@
+import base64
+import csv
+import io
+import json
+import logging
+from itertools import islice
+
+import openpyxl
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from datetime import datetime
+
+from .perf_log import profiled
+
+_logger = logging.getLogger(__name__)
+
+RELATION_TYPES = ['principal', 'spouse', 'child', 'newborn', 'other']
+GENDERS = ['male', 'female', 'other']
+FAMILY_SIZES = ['M', 'M+1', 'M+2', 'M+3', 'M+4']
+MAX_REPORTED_ERRORS = 50
+CSV_REQUIRED_HEADERS = {'name', 'age', 'relation_type', 'unique_identifier'}
+EXCEL_REQUIRED_HEADERS = {'MEMBER NAME*', 'PRIMARY MEMBER NAME*', 'MEM NUMBER*', 'RELATION*', 'DATE OF BIRTH', 'FAMILY SIZE', 'ID NUMBERS', 'PHONE NUMBER', 'EMAIL ADDRESS'}
+
+
+class InsuranceMemberImportMixin(models.AbstractModel):
+    """Parsing, validation and chunked creation of policy members from a CSV or Excel file."""
+    _name = 'insurance.member.import.mixin'
+    _description = 'Policy Member Import Mixin'
+
+    file_type = fields.Selection([('csv', 'CSV'), ('excel', 'Excel')], string='File Type', default='excel')
+    chunk_size = fields.Integer(string='Chunk Size', default=1000, help='Number of rows created per batch.')
+
+    def _iter_rows(self, data):
+        """
+        Stream the rows of the decoded file as ``(line, row)`` pairs. CSV is read through a
+        text wrapper and Excel through openpyxl's read-only mode, so the file is never
+        materialised as a full list of rows.
+        """
+        try:
+            if self.file_type == 'csv':
+                rows = csv.DictReader(io.TextIOWrapper(io.BytesIO(data), encoding='utf-8', newline=''))
+                if not rows.fieldnames:
+                    raise UserError("CSV file is empty or invalid.")
+                missing_headers = CSV_REQUIRED_HEADERS - set(rows.fieldnames)
+                if missing_headers:
+                    raise UserError(f"Missing required CSV headers: {', '.join(str(h) for h in missing_headers)}")
+                yield from enumerate(rows, start=2)
+            elif self.file_type == 'excel':
+                # Excel file (.xlsx) with header in second row
+                workbook = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+                try:
+                    sheet_rows = workbook.active.iter_rows(min_row=2, values_only=True)
+                    headers = next(sheet_rows, None)
+                    if not headers:
+                        raise UserError("Excel file is empty or invalid.")
+                    headers = [str(h).strip() if h is not None else None for h in headers]
+                    actual_headers = set(h for h in headers if h)
+                    _logger.debug("Actual headers in Excel file: %s", actual_headers)
+                    missing_headers = EXCEL_REQUIRED_HEADERS - actual_headers
+                    if missing_headers:
+                        raise UserError(f"Missing required Excel headers: {', '.join(str(h) for h in missing_headers)}. Found headers: {', '.join(str(h) for h in actual_headers)}")
+                    for line, values in enumerate(sheet_rows, start=3):
+                        if all(value is None for value in values):
+                            continue
+                        yield line, {header: value for header, value in zip(headers, values) if header}
+                finally:
+                    workbook.close()
+            else:
+                raise UserError("Unsupported file type. Please select CSV or Excel.")
+        except UserError:
+            raise
+        except Exception as e:
+            raise UserError(f"Error reading file: {str(e)}")
+
+    def _iter_chunks(self, data):
+        """Group the streamed rows into lists of at most ``chunk_size`` rows."""
+        rows = self._iter_rows(data)
+        while True:
+            chunk = list(islice(rows, self.chunk_size or 1000))
+            if not chunk:
+                return
+            yield chunk
+
+    @api.model
+    def _compute_age(self, date_of_birth):
+        if not date_of_birth:
+            return 0
+        today = datetime.now().date()
+        return int(today.year - date_of_birth.year - ((today.month, today.day) < (date_of_birth.month, date_of_birth.day)))
+
+    @api.model
+    def _parse_relation_type(self, relation_input):
+        relation_type = 'principal' if relation_input and relation_input.upper() == 'SELF' else (relation_input.lower() if relation_input else 'principal')
+        if relation_type not in RELATION_TYPES:
+            raise UserError(f"Invalid 'relation_type' in row: {relation_input} (must be 'principal', 'spouse', 'child', 'newborn', or 'other')")
+        return relation_type
+
+    def _prepare_csv_member_vals(self, row, policy):
+        member_vals = {
+            'policy_id': policy.id,
+            'name': row.get('name'),
+            'id_no': row.get('id_no'),
+            'email': row.get('email'),
+            'phone': row.get('phone'),
+            'relation_type': row.get('relation_type', 'principal'),
+            'band_label': row.get('band_label', 'M'),
+            'state': 'pending',
+            'gender': row.get('gender').lower() if row.get('gender') else None,
+            'date_of_birth': datetime.strptime(row.get('date_of_birth', ''), '%Y-%m-%d').date() if row.get('date_of_birth') else None,
+            'unique_identifier': row.get('unique_identifier'),
+        }
+        member_vals['age'] = self._compute_age(member_vals['date_of_birth'])
+
+        # Validate required fields
+        if not member_vals['name']:
+            raise UserError(f"Missing 'name' in row: {row}")
+        if not member_vals['unique_identifier']:
+            raise UserError(f"Missing 'unique_identifier' in row: {row}")
+        if member_vals['relation_type'] not in RELATION_TYPES:
+            raise UserError(f"Invalid 'relation_type' in row: {row['relation_type']} (must be 'principal', 'spouse', 'child', 'newborn', or 'other')")
+        if member_vals['gender'] and member_vals['gender'] not in GENDERS:
+            raise UserError(f"Invalid 'gender' in row: {row['gender']} (must be 'male', 'female', or 'other')")
+        if member_vals['band_label'] != 'M' and member_vals['relation_type'] == 'principal':
+            raise UserError(f"Invalid 'band_label' for principal member in row: {row['band_label']} should be 'M'")
+        return member_vals
+
+    def _prepare_excel_member_vals(self, row, policy):
+        """Return the member values of an Excel row and the principal name it depends on, if any."""
+        member_name = row.get('MEMBER NAME*')
+        principal_name = row.get('PRIMARY MEMBER NAME*')
+        is_dependent = member_name != principal_name if principal_name else False
+
+        if not member_name:
+            raise UserError(f"Missing 'MEMBER NAME*' in row: {row}")
+        if not row.get('MEM NUMBER*'):
+            raise UserError(f"Missing 'MEM NUMBER*' in row: {row}")
+        if not row.get('RELATION*'):
+            raise UserError(f"Missing 'RELATION*' in row: {row}")
+        if row.get('DATE OF BIRTH') and not isinstance(row.get('DATE OF BIRTH'), datetime):
+            raise UserError(f"Invalid 'DATE OF BIRTH' format in row: {row} (expected date)")
+        if row.get('FAMILY SIZE') not in FAMILY_SIZES:
+            raise UserError(f"Invalid 'FAMILY SIZE' in row: {row} (must be M, M+1, M+2, M+3, or M+4)")
+
+        gender_input = row.get('GENDER')
+        gender = gender_input.lower() if gender_input else None
+        if gender and gender not in GENDERS:
+            raise UserError(f"Invalid 'gender' in row: {gender_input} (must be 'male', 'female', or 'other')")
+
+        relation_type = self._parse_relation_type(row.get('RELATION*'))
+        date_of_birth = row.get('DATE OF BIRTH')
+
+        member_vals = {
+            'policy_id': policy.id,
+            'name': member_name,
+            'unique_identifier': row.get('MEM NUMBER*'),
+            'relation_type': relation_type,
+            'date_of_birth': date_of_birth.date() if date_of_birth else None,
+            'age': self._compute_age(date_of_birth),
+            'gender': gender,
+            'band_label': row.get('FAMILY SIZE', 'M'),
+            'state': 'pending',
+            'id_no': row.get('ID NUMBERS'),
+            'phone': row.get('PHONE NUMBER'),
+            'email': row.get('EMAIL ADDRESS'),
+        }
+        if member_vals['band_label'] != 'M' and member_vals['relation_type'] == 'principal':
+            raise UserError(f"Invalid 'band_label' for principal member in row: {row['FAMILY SIZE']} should be 'M'")
+        return member_vals, principal_name if is_dependent else False
+
+    def _prepare_row(self, row, policy):
+        """Return the member values of a row and the principal name it depends on, if any."""
+        try:
+            if self.file_type == 'csv':
+                return self._prepare_csv_member_vals(row, policy), False
+            return self._prepare_excel_member_vals(row, policy)
+        except ValueError as ve:
+            raise UserError(f"Invalid value (e.g., age must be an integer, date must be valid). {str(ve)}")
+        except UserError:
+            raise
+        except Exception as e:
+            raise UserError(str(e))
+
+    def _validate_rows(self, data, policy):
+        """
+        First pass over the file: validate every row and make sure each dependent's principal
+        is present. Only principal keys are kept in memory, not the rows themselves.
+        """
+        principal_keys = set()
+        dependents = []
+        errors = []
+        for line, row in self._iter_rows(data):
+            try:
+                member_vals, principal_name = self._prepare_row(row, policy)
+            except UserError as e:
+                errors.append(f"Line {line}: {e}")
+                continue
+            if principal_name:
+                dependents.append((line, member_vals['name'], principal_name))
+            else:
+                principal_keys.update((member_vals['name'], member_vals['unique_identifier']))
+
+        for line, member_name, principal_name in dependents:
+            if principal_name not in principal_keys:
+                errors.append(f"Line {line}: Principal member '{principal_name}' of '{member_name}' was not found in the file.")
+        return errors
+
+    def _create_members(self, rows, errors=None):
+        """
+        Create the members of ``rows`` (``(line, vals)`` pairs) in one batch and return the
+        ``(vals, member)`` pairs created. When ``errors`` is given, a failing batch is retried
+        row by row so that a bad row is recorded there instead of rolling back the others.
+        """
+        Member = self.env['insurance.policy.member']
+        if errors is None:
+            vals_list = [vals for line, vals in rows]
+            return list(zip(vals_list, Member.create(vals_list)))
+        try:
+            with self.env.cr.savepoint():
+                vals_list = [vals for line, vals in rows]
+                return list(zip(vals_list, Member.create(vals_list)))
+        except Exception:
+            created = []
+            for line, vals in rows:
+                try:
+                    with self.env.cr.savepoint():
+                        created.append((vals, Member.create(vals)))
+                except Exception as e:
+                    errors.append((line, str(e)))
+            return created
+
+    def _import_chunk(self, chunk, policy, principal_ids, pending_dependents, errors=None):
+        """
+        Create the members of one chunk: principals first, then every dependent whose
+        principal is known. Dependents listed before their principal stay in
+        ``pending_dependents`` until a later chunk creates it. Invalid rows raise, or are
+        collected as ``(line, message)`` in ``errors`` when it is given.
+        """
+        principal_rows = []
+        for line, row in chunk:
+            try:
+                member_vals, principal_name = self._prepare_row(row, policy)
+            except UserError as e:
+                if errors is None:
+                    raise
+                errors.append((line, str(e)))
+                continue
+            if principal_name:
+                pending_dependents.append((line, member_vals, principal_name))
+            else:
+                principal_rows.append((line, member_vals))
+
+        principals = self._create_members(principal_rows, errors)
+        # Resolve principals by member name or MEM NUMBER
+        for principal_vals, principal in principals:
+            principal_ids.setdefault(principal_vals['name'], principal.id)
+            principal_ids.setdefault(principal_vals['unique_identifier'], principal.id)
+
+        dependent_rows = []
+        waiting = []
+        for line, member_vals, principal_name in pending_dependents:
+            if principal_name in principal_ids:
+                member_vals['principal_member_id'] = principal_ids[principal_name]
+                dependent_rows.append((line, member_vals))
+            else:
+                waiting.append((line, member_vals, principal_name))
+        pending_dependents[:] = waiting
+        dependents = self._create_members(dependent_rows, errors)
+        return len(principals) + len(dependents)
+
+    def _resolve_existing_principals(self, policy, principal_ids, names):
+        """Complete ``principal_ids`` with principals of ``policy`` already in the database."""
+        names = [name for name in names if name not in principal_ids]
+        if not names:
+            return
+        principals = self.env['insurance.policy.member'].search([
+            ('policy_id', '=', policy.id),
+            ('principal_member_id', '=', False),
+            '|', ('name', 'in', names), ('unique_identifier', 'in', names),
+        ])
+        for principal in principals:
+            principal_ids.setdefault(principal.name, principal.id)
+            principal_ids.setdefault(principal.unique_identifier, principal.id)
+
+
+class InsuranceImportJob(models.Model):
+    """A member file queued for import by the scheduled job, processed chunk by chunk."""
+    _name = 'insurance.import.job'
+    _inherit = ['insurance.member.import.mixin']
+    _description = 'Policy Member Import Job'
+    _order = 'id desc'
+
+    name = fields.Char(string='Reference', required=True, readonly=True, default=lambda self: f"IMPORT/{fields.Datetime.now():%Y%m%d%H%M%S}")
+    policy_id = fields.Many2one('insurance.policy', string='Policy', required=True, ondelete='cascade', index=True)
+    file = fields.Binary('Member File', required=True, attachment=True)
+    file_name = fields.Char('File Name')
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='queued', required=True, index=True)
+    last_line = fields.Integer(string='Last Processed Line', readonly=True, help='File line up to which rows have been committed, used to resume an interrupted job.')
+    pending_lines = fields.Text(string='Pending Dependent Lines', readonly=True,
+                                help='JSON list of the committed lines of dependents still waiting for their principal, read again when an interrupted job resumes.')
+    processed_count = fields.Integer(string='Imported Rows', readonly=True)
+    failed_count = fields.Integer(string='Failed Rows', readonly=True)
+    error_ids = fields.One2many('insurance.import.job.error', 'job_id', string='Errors', readonly=True)
+    error_report_id = fields.Many2one('ir.attachment', string='Error Report', readonly=True)
+
+    @api.model
+    def _cron_process_import_jobs(self):
+        """Process queued member imports, committing after every chunk."""
+        for job in self.search([('state', 'in', ['queued', 'running'])], order='id'):
+            job.state = 'running'
+            self.env.cr.commit()
+            try:
+                job._process()
+            except Exception as e:
+                self.env.cr.rollback()
+                _logger.exception("Member import %s failed.", job.name)
+                job.write({'state': 'failed', 'error_ids': [(0, 0, {'line': 0, 'message': f"Import aborted: {e}"})]})
+                job.policy_id.message_post(body=f"Member import {job.name} failed: {e}")
+            self.env.cr.commit()
+
+    @profiled('action_import', rows=lambda job, _result: job.processed_count)
+    def _process(self):
+        self.ensure_one()
+        policy = self.policy_id
+        data = base64.b64decode(self.file)
+        principal_ids = {}
+        pending_dependents = []
+        resumed_lines = set(json.loads(self.pending_lines or '[]'))
+        for chunk in self._iter_chunks(data):
+            # Skip the rows committed by a previous, interrupted run, except the dependents
+            # that were still waiting for their principal when it stopped
+            chunk = [(line, row) for line, row in chunk if line > self.last_line or line in resumed_lines]
+            if not chunk:
+                continue
+            errors = []
+            imported = self._import_chunk(chunk, policy, principal_ids, pending_dependents, errors)
+            self._record_progress(max(self.last_line, chunk[-1][0]), imported, errors, pending_dependents)
+            self.env.cr.commit()
+            self.env.invalidate_all()
+
+        # Dependents whose principal came from an earlier run or an earlier import
+        if pending_dependents:
+            self._resolve_existing_principals(policy, principal_ids, {name for line, vals, name in pending_dependents})
+            errors = []
+            imported = self._import_chunk([], policy, principal_ids, pending_dependents, errors)
+            errors += [
+                (line, f"Principal member '{principal_name}' of '{vals['name']}' was not found.")
+                for line, vals, principal_name in pending_dependents
+            ]
+            self._record_progress(self.last_line, imported, errors, pending_dependents)
+        self._finish()
+
+    def _record_progress(self, last_line, imported, errors, pending_dependents):
+        vals = {
+            'last_line': last_line,
+            'pending_lines': json.dumps([line for line, vals, principal_name in pending_dependents]),
+            'processed_count': self.processed_count + imported,
+            'failed_count': self.failed_count + len(errors),
+        }
+        self.write(vals)
+        # Append only this chunk's errors, one record each, so multi-line messages stay whole
+        self.env['insurance.import.job.error'].create([
+            {'job_id': self.id, 'line': line, 'message': message} for line, message in errors
+        ])
+        _logger.info("Member import %s: %s rows imported, %s failed so far.", self.name, self.processed_count, self.failed_count)
+
+    def _finish(self):
+        vals = {'state': 'done'}
+        attachment_ids = []
+        errors = self.env['insurance.import.job.error'].search_read([('job_id', '=', self.id)], ['line', 'message'], order='line, id')
+        if errors:
+            report = io.StringIO()
+            writer = csv.writer(report)
+            writer.writerow(['line', 'error'])
+            writer.writerows([error['line'], error['message']] for error in errors)
+            attachment = self.env['ir.attachment'].create({
+                'name': f"{self.name.replace('/', '_')}_errors.csv",
+                'raw': report.getvalue().encode('utf-8'),
+                'mimetype': 'text/csv',
+                'res_model': self.policy_id._name,
+                'res_id': self.policy_id.id,
+            })
+            vals['error_report_id'] = attachment.id
+            attachment_ids.append(attachment.id)
+        self.write(vals)
+        self.policy_id.message_post(
+            body=f"Member import {self.name} finished: {self.processed_count} rows imported, {self.failed_count} rows failed.",
+            attachment_ids=attachment_ids,
+        )
+
+
+class InsuranceImportJobError(models.Model):
+    """A row, or the whole job when ``line`` is 0, that a member import job could not import."""
+    _name = 'insurance.import.job.error'
+    _description = 'Policy Member Import Error'
+    _order = 'line, id'
+
+    job_id = fields.Many2one('insurance.import.job', string='Import', required=True, ondelete='cascade', index=True)
+    line = fields.Integer(string='Line', readonly=True)
+    message = fields.Text(string='Error', readonly=True)
@@ -0,0 +1,94 @@
+from odoo import models, fields, api
+from odoo.tools import str2bool
+from contextlib import contextmanager
+from datetime import timedelta
+import functools
+import logging
+import time
+
+
+_logger = logging.getLogger(__name__)
+
+# System parameter switching the instrumentation on, e.g. set to "True" in Settings > Technical
+PERF_LOG_PARAM = 'insurance_management.perf_logging'
+PERF_LOG_RETENTION_DAYS = 30
+
+
+def _count_records(records, result):
+    return len(records)
+
+
+def profiled(flow, rows=_count_records):
+    """
+    Decorate a recordset method so that each call is recorded as an ``insurance.perf.log``
+    entry named ``flow`` while the instrumentation is switched on. ``rows`` gets the
+    recordset and the method's result once the call has returned and gives the number of
+    rows it touched, e.g. the members of the policies rather than the policies themselves.
+    Do not use it on compute methods: their writes are only flushed by the caller.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.env['insurance.perf.log']._measure(flow, self) as stats:
+                result = method(self, *args, **kwargs)
+                stats['rows'] = rows(self, result)
+            return result
+        return wrapper
+    return decorator
+
+
+class InsurancePerfLog(models.Model):
+    _name = 'insurance.perf.log'
+    _description = 'Insurance Flow Performance Log'
+    _order = 'id desc'
+
+    name = fields.Char(string='Flow', required=True, readonly=True, index=True)
+    model_name = fields.Char(string='Model', readonly=True)
+    duration = fields.Float(string='Duration (s)', readonly=True, digits=(16, 4), aggregator='avg')
+    query_count = fields.Integer(string='Queries', readonly=True, aggregator='avg')
+    row_count = fields.Integer(string='Rows', readonly=True, aggregator='sum')
+    failed = fields.Boolean(string='Failed', readonly=True, help='The flow raised an error and was rolled back.')
+    user_id = fields.Many2one('res.users', string='User', readonly=True, default=lambda self: self.env.user)
+
+    @api.model
+    def _is_enabled(self):
+        return str2bool(self.env['ir.config_parameter'].sudo().get_param(PERF_LOG_PARAM, 'False'), False)
+
+    @contextmanager
+    def _measure(self, flow, records):
+        """
+        Measure the wall time and the SQL queries of the enclosed block and log them for
+        ``flow`` when the instrumentation is switched on. The block may set ``stats['rows']``;
+        it defaults to the size of ``records``. Queries deferred to a later flush are counted
+        where they are flushed. The entry is written in its own transaction, so flows that
+        fail and roll back are logged too.
+        """
+        stats = {'rows': len(records)}
+        if not self._is_enabled():
+            yield stats
+            return
+        cr = self.env.cr
+        start_queries = cr.sql_log_count
+        start = time.perf_counter()
+        failed = True
+        try:
+            yield stats
+            failed = False
+        finally:
+            duration = time.perf_counter() - start
+            query_count = cr.sql_log_count - start_queries
+            with self.env.registry.cursor() as log_cr:
+                self.with_env(self.env(cr=log_cr, su=True)).create({
+                    'name': flow,
+                    'model_name': records._name,
+                    'duration': duration,
+                    'query_count': query_count,
+                    'row_count': stats['rows'],
+                    'failed': failed,
+                })
+            _logger.info(f"{flow} on {stats['rows']} {records._name} rows: {duration:.3f}s, {query_count} queries{', failed' if failed else ''}.")
+
+    @api.autovacuum
+    def _gc_perf_logs(self):
+        limit_date = fields.Datetime.now() - timedelta(days=PERF_LOG_RETENTION_DAYS)
+        self.sudo().search([('create_date', '<', limit_date)]).unlink()
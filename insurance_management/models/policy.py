@@ -1,12 +1,19 @@
 from odoo import models, fields, api
 from odoo.exceptions import UserError, ValidationError
+from odoo.tools import float_round
 import logging
-from datetime import timedelta, datetime
+from collections import defaultdict
+from datetime import timedelta
 from dateutil.relativedelta import relativedelta
 import pytz
 
+from .perf_log import profiled
+from ..tools.proration import prorate
+
 _logger = logging.getLogger(__name__)
 
+RENEWAL_REMINDER_DAYS = [60, 40, 30]
+
 class InsurancePolicy(models.Model):
     _name = 'insurance.policy'
     _description = 'Insurance Policy'
@@ -54,7 +61,7 @@ class InsurancePolicy(models.Model):
     claim_id = fields.Many2one('medical.claim', string='Claim')
     active_date = fields.Datetime(string='Activation Date', help='Date when the policy was set to active.')
     invoice_ids = fields.One2many('account.move', 'insurance_policy_id', string='Invoices', readonly=True)
-    end_date = fields.Date(string='Policy End Date', compute='_compute_end_date', store=True)
+    end_date = fields.Date(string='Policy End Date', compute='_compute_end_date', store=True, index=True)
     policy_frequency = fields.Selection([
         ('annual', 'Annually'),
         ('monthly', 'Monthly'),
@@ -64,6 +71,12 @@ class InsurancePolicy(models.Model):
         default=12,
         help="Only applicable if frequency is Monthly"
     )
+    invoice_line_grouping = fields.Selection([
+        ('member', 'One Line per Member'),
+        ('band', 'One Line per Band'),
+        ('relation', 'One Line per Relation Type'),
+    ], string='Invoice Lines', default='member', required=True,
+        help="Grouped invoices bill one line per band or relation type. The per-member amounts are kept in the invoice's member breakdown.")
 
 
     commission_plan_id = fields.Many2one(
@@ -73,6 +86,7 @@ class InsurancePolicy(models.Model):
         help='The commission plan applied to this policy.'
     )
     commission_ids = fields.One2many('insurance.commission', 'policy_id', string='Commissions', readonly=True)
+    endorsement_ids = fields.One2many('insurance.policy.endorsement', 'policy_id', string='Endorsements', readonly=True)
     total_commission = fields.Float(
         string='Total Commission',
         compute='_compute_total_commission',
@@ -82,8 +96,11 @@ class InsurancePolicy(models.Model):
 
     @api.depends('commission_ids.commission_amount')
     def _compute_total_commission(self):
+        totals = dict(self.env['insurance.commission']._read_group(
+            [('policy_id', 'in', self.ids)], ['policy_id'], ['commission_amount:sum'],
+        ))
         for policy in self:
-            policy.total_commission = sum(policy.commission_ids.mapped('commission_amount'))
+            policy.total_commission = totals.get(policy, 0.0)
 
     def action_view_commissions(self):
         self.ensure_one()
@@ -97,6 +114,18 @@ class InsurancePolicy(models.Model):
             'name': f'Commissions for {self.name}',
         }
 
+    def action_view_endorsements(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'insurance.policy.endorsement',
+            'view_mode': 'list,form',
+            'domain': [('policy_id', '=', self.id)],
+            'context': {'default_policy_id': self.id},
+            'target': 'current',
+            'name': f'Endorsements for {self.name}',
+        }
+
     def action_achievement_detail(self):
         self.ensure_one()
         return {
@@ -164,43 +193,65 @@ class InsurancePolicy(models.Model):
                         "Member states must be empty in cancelled policies."
                     )
 
-    def _sync_member_states(self):
-        for policy in self:
-            with self.env.cr.savepoint():
-                if policy.state == "cancelled":
-                    (policy.member_ids | policy.deleted_ids).with_context(allow_cancel_state_change=True).write({"state": False})
-                    _logger.info(f"Policy {policy.name} cancelled: all member states set to False.")
-                elif policy.payment_type == "underwriter":
-                    policy.member_ids.write({
-                        "state": "active" if policy.state == "active" else "pending",
-                        "activation_date": fields.Datetime.now() if policy.state == "active" else False,
-                    })
-                    _logger.info(f"Policy {policy.name} (underwriter): member states set to {policy.state}.")
-                elif policy.payment_type == "broker":
-                    paid_invoice = self.env["account.move"].search([
-                        ("insurance_policy_id", "=", policy.id),
-                        ("move_type", "=", "out_invoice"),
-                        ("payment_state", "=", "paid"),
-                    ], limit=1)
-                    if paid_invoice:
-                        policy.write({
-                            'state': 'active',
-                            'active_date': fields.Datetime.now() if not policy.active_date else policy.active_date
-                        })
-                        pending_members = policy.member_ids.filtered(lambda m: m.state == 'pending')
-                        pending_members.write({
-                            'state': 'active',
-                            'activation_date': fields.Datetime.now()
-                        })
-                        _logger.info(f'Policy {policy.name} set to active: paid invoice {paid_invoice.name} found. Updated {len(pending_members)} pending members.')
-                    else:
-                        policy.write({"state": "draft"})
-                        policy.member_ids.write({"state": "pending", "activation_date": False})
-                        _logger.info(f"Policy {policy.name} set to draft: no paid invoice found.")
-
-    @api.onchange("state", "payment_type")
-    def _onchange_state(self):
+    def write(self, vals):
+        if self.env.context.get('skip_member_sync') or not ({'state', 'payment_type'} & set(vals)):
+            return super(InsurancePolicy, self).write(vals)
+        policies = self.with_context(allow_cancel_state_change=True) if vals.get('state') == 'cancelled' else self
+        res = super(InsurancePolicy, policies).write(vals)
         self._sync_member_states()
+        return res
+
+    @profiled('_sync_member_states', rows=lambda policies, _result: len(policies.member_ids))
+    def _sync_member_states(self):
+        """
+        Sync the member states of all policies at once: paid status of broker policies comes
+        from one grouped query on their invoices, and members are updated with one write per
+        target state instead of one per policy.
+        """
+        if not self:
+            return
+        now = fields.Datetime.now()
+        policies = self.with_context(skip_member_sync=True)
+        cancelled = policies.filtered(lambda p: p.state == "cancelled")
+        underwriter = policies.filtered(lambda p: p.state != "cancelled" and p.payment_type == "underwriter")
+        broker = policies.filtered(lambda p: p.state != "cancelled" and p.payment_type == "broker")
+        with self.env.cr.savepoint():
+            if cancelled:
+                (cancelled.member_ids | cancelled.deleted_ids).with_context(allow_cancel_state_change=True).write({"state": False})
+                _logger.info(f"{len(cancelled)} cancelled policies: all member states set to False.")
+
+            if underwriter:
+                active = underwriter.filtered(lambda p: p.state == "active")
+                active.member_ids.write({"state": "active", "activation_date": now})
+                (underwriter - active).member_ids.write({"state": "pending", "activation_date": False})
+                _logger.info(f"{len(underwriter)} underwriter policies: member states set to {len(active)} active, {len(underwriter - active)} pending.")
+
+            if broker:
+                paid_policy_ids = {
+                    policy.id for policy, in self.env["account.move"]._read_group(
+                        [
+                            ("insurance_policy_id", "in", broker.ids),
+                            ("move_type", "=", "out_invoice"),
+                            ("payment_state", "=", "paid"),
+                        ],
+                        ["insurance_policy_id"],
+                    )
+                }
+                paid = broker.filtered(lambda p: p.id in paid_policy_ids)
+                unpaid = broker - paid
+                if paid:
+                    paid.filtered(lambda p: p.state != "active").write({"state": "active"})
+                    paid.filtered(lambda p: not p.active_date).write({"active_date": now})
+                    pending_members = self.env["insurance.policy.member"].search([
+                        ("policy_id", "in", paid.ids),
+                        ("state", "=", "pending"),
+                    ])
+                    pending_members.write({"state": "active", "activation_date": now})
+                    _logger.info(f"{len(paid)} broker policies set to active: paid invoice found. Updated {len(pending_members)} pending members.")
+                if unpaid:
+                    unpaid.write({"state": "draft"})
+                    unpaid.member_ids.write({"state": "pending", "activation_date": False})
+                    _logger.info(f"{len(unpaid)} broker policies set to draft: no paid invoice found.")
 
     def action_import_members(self):
         self.ensure_one()
@@ -217,124 +268,225 @@ class InsurancePolicy(models.Model):
         for policy in self:
             if policy.payment_type == "broker":
                 raise UserError("Cannot confirm policy when payment is handled by the broker. Mark the invoice as paid to activate.")
+            # Writing the state syncs the member states
             policy.write({"state": "active", "active_date": fields.Datetime.now()})
-            policy._sync_member_states()
-
-    def action_create_invoice(self):
-        for policy in self:
-            if policy.payment_type != 'broker':
-                raise UserError('Invoicing is only allowed for policies with payment type "Direct to Broker".')
-            if not policy.partner_id:
-                raise UserError('No customer found. Ensure the policy has a valid Related Contact assigned.')
-            if not policy.commission_plan_id:
-                raise UserError('Cannot create invoice without a commission plan. Please select a commission plan.')
-            
-            account = self.env["account.account"].search([("account_type", "=", "income")], limit=1)
-            if not account:
-                raise UserError('No income account found. Configure an income account in Accounting > Configuration > Chart of Accounts.')
-            lines = []
-            members = policy.member_ids if policy.state == "draft" else policy.member_ids.filtered(lambda m: m.state == "pending")
-            if not members:
-                raise UserError('No members to invoice. Add members to the policy or ensure some members are in "Pending" state for active policies.')
-            invoice_date = fields.Date.today()
-            end_datetime = datetime.combine(policy.end_date, datetime.min.time()) if policy.end_date else False
-            total_days = (end_datetime - policy.active_date).days if policy.active_date and end_datetime else 0
 
-            total_premium = 0.0
+    @api.model
+    def _get_income_account(self):
+        account = self.env["account.account"].search([("account_type", "=", "income")], limit=1)
+        if not account:
+            raise UserError('No income account found. Configure an income account in Accounting > Configuration > Chart of Accounts.')
+        return account
+
+    def _get_locked_premiums(self, members, invoice_date):
+        """
+        Premiums locked on ``members`` when they are invoiced on ``invoice_date``, as a
+        ``{member: locked_premium}`` dict. Members added after activation carry a premium
+        prorated from their creation date, which is prorated again from the invoice date.
+        """
+        self.ensure_one()
+        locked_premiums = {member: member.premium for member in members}
+        if not self.active_date or not self.end_date or (self.end_date - self.active_date.date()).days <= 0:
+            return locked_premiums
+        added = members.filtered(lambda m: m.state == 'pending' and m.added_after_activation)
+        amounts = prorate(
+            added.mapped('premium'),
+            [member.creation_date or self.active_date for member in added],
+            [self.end_date] * len(added),
+            [invoice_date] * len(added),
+        )
+        locked_premiums.update(zip(added, amounts.tolist()))
+        return locked_premiums
+
+    def _prepare_invoice_vals(self, members, account, invoice_date):
+        """
+        Return the values of the invoice of ``members`` and their locked premiums as a
+        ``{member: locked_premium}`` dict, without writing anything.
+        """
+        self.ensure_one()
+        lines = []
+        for m in members:
+            if not m.premium:
+                raise UserError(f"Member {m.name} has no premium. Ensure the policy has a valid Rate Table configured.")
+        locked_premiums = self._get_locked_premiums(members, invoice_date)
+        if self.invoice_line_grouping == 'member':
             for m in members:
-                if not m.premium:
-                    raise UserError(f"Member {m.name} has no premium. Ensure the policy has a valid Rate Table configured.")
-                full_premium = m.premium
-                if m.state == 'pending' and m.added_after_activation and total_days > 0 and end_datetime:
-                    covered_days = (end_datetime - datetime.combine(invoice_date, datetime.min.time())).days
-                    if covered_days > 0:
-                        proration_ratio = covered_days / total_days
-                        m.locked_premium = full_premium / (m.creation_date and (end_datetime - m.creation_date).days / total_days or 1) * proration_ratio
-                    else:
-                        m.locked_premium = 0.0
-                else:
-                    m.locked_premium = full_premium
-                total_premium += m.locked_premium
                 lines.append(
                     (0, 0, {
-                        "name": f"{policy.name} - Premium: {m.name} ({m.band_label or m.relation_type})",
+                        "name": f"{self.name} - Premium: {m.name} ({m.band_label or m.relation_type})",
                         "quantity": 1,
                         "price_unit": m.premium,
                         "account_id": account.id,
                         "insurance_policy_member_id": m.id,
-                        "partner_id": m.partner_id.id if m.partner_id else policy.partner_id.id,
+                        "partner_id": m.partner_id.id if m.partner_id else self.partner_id.id,
                     }),
                 )
-
-            invoice = self.env["account.move"].create({
-                "move_type": "out_invoice",
-                "partner_id": policy.partner_id.id,
-                "invoice_line_ids": lines,
-                "insurance_policy_id": policy.id,
-                "invoice_date": invoice_date,
+        else:
+            groups = defaultdict(lambda: self.env["insurance.policy.member"])
+            for m in members:
+                label = m.relation_type if self.invoice_line_grouping == 'relation' else (m.band_label or m.relation_type)
+                groups[(label, m.premium)] |= m
+            for (label, premium), group in groups.items():
+                lines.append(
+                    (0, 0, {
+                        "name": f"{self.name} - Premium: {label}",
+                        "quantity": len(group),
+                        "price_unit": premium,
+                        "account_id": account.id,
+                        "partner_id": self.partner_id.id,
+                        "insurance_grouped_premium": True,
+                    }),
+                )
+        member_lines = [
+            (0, 0, {
+                "member_id": m.id,
+                "group_label": m.relation_type if self.invoice_line_grouping == 'relation' else (m.band_label or m.relation_type),
+                "amount": m.premium,
+                "locked_premium": locked_premiums[m],
             })
-            invoice.action_post()
-            _logger.info(f"Invoice {invoice.name} created for policy {policy.name} with {len(lines)} lines.")
+            for m in members
+        ] if self.invoice_line_grouping != 'member' else []
+        invoice_vals = {
+            "move_type": "out_invoice",
+            "partner_id": self.partner_id.id,
+            "invoice_line_ids": lines,
+            "insurance_policy_id": self.id,
+            "invoice_date": invoice_date,
+            "insurance_member_line_ids": member_lines,
+        }
+        return invoice_vals, locked_premiums
+
+    @api.model
+    def _write_locked_premiums(self, locked_premiums):
+        """Write locked premiums with one write per distinct amount instead of one per member."""
+        members_by_amount = defaultdict(lambda: self.env["insurance.policy.member"])
+        for member, amount in locked_premiums.items():
+            members_by_amount[float_round(amount, precision_digits=2)] |= member
+        for amount, members in members_by_amount.items():
+            members.write({"locked_premium": amount})
+
+    @profiled('action_create_invoice', rows=lambda policies, _result: len(policies.member_ids))
+    def action_create_invoice(self):
+        for policy in self:
+            if policy.payment_type != 'broker':
+                raise UserError('Invoicing is only allowed for policies with payment type "Direct to Broker".')
+            if not policy.partner_id:
+                raise UserError('No customer found. Ensure the policy has a valid Related Contact assigned.')
+            if not policy.commission_plan_id:
+                raise UserError('Cannot create invoice without a commission plan. Please select a commission plan.')
+
+        account = self._get_income_account()
+        invoice_date = fields.Date.today()
+        invoice_vals_list = []
+        locked_premiums = {}
+        for policy in self:
+            members = policy.member_ids if policy.state == "draft" else policy.member_ids.filtered(lambda m: m.state == "pending")
+            if not members:
+                raise UserError(f'No members to invoice on policy {policy.name}. Add members to the policy or ensure some members are in "Pending" state for active policies.')
+            invoice_vals, policy_locked_premiums = policy._prepare_invoice_vals(members, account, invoice_date)
+            invoice_vals_list.append(invoice_vals)
+            locked_premiums.update(policy_locked_premiums)
+
+        self._write_locked_premiums(locked_premiums)
+        invoices = self.env["account.move"].create(invoice_vals_list)
+        invoices.action_post()
+        _logger.info(f"{len(invoices)} invoices created for {len(self)} policies with {len(locked_premiums)} member lines.")
+        if len(invoices) == 1:
             return {
                 'type': 'ir.actions.act_window',
                 'res_model': 'account.move',
                 'view_mode': 'form',
-                'res_id': invoice.id,
+                'res_id': invoices.id,
                 'target': 'current',
             }
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Policy Invoices',
+            'res_model': 'account.move',
+            'view_mode': 'list,form',
+            'domain': [('id', 'in', invoices.ids)],
+            'target': 'current',
+        }
 
-    def _create_credit_note_for_member(self, member):
-        if not self.partner_id:
-            raise UserError(f"Cannot create credit note for member {member.name}. Ensure the policy has a valid Related Contact assigned.")
-        account = self.env["account.account"].search([("account_type", "=", "income")], limit=1)
-        if not account:
-            raise UserError("No income account found. Configure an income account in Accounting > Configuration > Chart of Accounts.")
-        if not member.locked_premium and not member.premium:
-            _logger.warning(f"Member {member.name} has no premium to refund. Skipping credit note creation.")
-            return False
-
-        refund_amount = 0.0
-        covered_days = 0
-        non_covered_days = 0
-
-        if member.state == 'deleted' and self.state == 'active' and (member.locked_premium or member.premium):
-            end_date = self.end_date
-            deletion_date = (member.deletion_date or fields.Datetime.now()).date()
-            start_date = None
-            invoice_line = member.invoice_line_ids.filtered(lambda l: l.move_id.move_type == 'out_invoice' and l.move_id.payment_state == 'paid')[:1]
-            if invoice_line and invoice_line.move_id.invoice_date:
-                start_date = invoice_line.move_id.invoice_date
+    def _get_member_refund_amounts(self, members, deletion_datetime=None):
+        """
+        Prorated refunds of the deleted ``members`` as a ``{member: amount}`` dict, computed in
+        one proration call. Members with nothing to refund get 0.0.
+        """
+        self.ensure_one()
+        refunds = dict.fromkeys(members, 0.0)
+        refundable, starts, events = [], [], []
+        end_date = self.end_date
+        paid_invoice_dates = members._get_paid_invoice_dates()
+        for member in members:
+            if not member.locked_premium and not member.premium:
+                _logger.warning(f"Member {member.name} has no premium to refund. Skipping credit note creation.")
+                continue
+            if member.state != 'deleted' or self.state != 'active':
+                continue
+
+            deletion_date = (member.deletion_date or deletion_datetime or fields.Datetime.now()).date()
+            if member in paid_invoice_dates:
+                start_date = paid_invoice_dates[member]
             else:
                 start_date = (member.creation_date or member.activation_date or self.active_date or fields.Datetime.now()).date()
 
             if not end_date or end_date <= start_date or deletion_date < start_date:
                 _logger.warning(f"Invalid dates for policy {self.name} and member {member.name}. Skipping credit note.")
-                return False
+                continue
+            refundable.append(member)
+            starts.append(start_date)
+            events.append(deletion_date)
 
-            covered_days = (end_date - start_date).days
-            non_covered_days = (end_date - deletion_date).days
-            if covered_days > 0 and non_covered_days > 0 and non_covered_days <= covered_days:
-                proration_ratio = non_covered_days / covered_days
-                refund_amount = (member.premium) * proration_ratio
+        amounts = prorate([member.premium for member in refundable], starts, [end_date] * len(refundable), events)
+        refunds.update(zip(refundable, amounts.tolist()))
+        return refunds
 
-        if refund_amount <= 0:
-            _logger.info(f"No refundable amount for member {member.name}. Skipping credit note.")
-            return False
-
-        credit_note = self.env["account.move"].create({
-            "move_type": "out_refund",
-            "partner_id": self.partner_id.id,
-            "invoice_line_ids": [(0, 0, {
+    def _prepare_refund_lines(self, members, account):
+        """Credit note line values of the deleted ``members`` that have a refundable amount."""
+        self.ensure_one()
+        refunds = self._get_member_refund_amounts(members, fields.Datetime.now())
+        lines = []
+        for member in members:
+            refund_amount = refunds[member]
+            if refund_amount <= 0:
+                _logger.info(f"No refundable amount for member {member.name}. Skipping credit note.")
+                continue
+            lines.append((0, 0, {
                 "name": f"{self.name} - Credit for deleted member: {member.name} ({member.band_label or member.relation_type})",
                 "quantity": 1,
                 "price_unit": refund_amount,
                 "account_id": account.id,
                 "insurance_policy_member_id": member.id,
-            })],
+            }))
+        return lines
+
+    def _create_credit_note_for_members(self, members):
+        """
+        Refund the deleted ``members`` of this policy with one consolidated credit note,
+        one line per member with a refundable amount. Returns the credit note, possibly empty.
+        """
+        self.ensure_one()
+        if not self.partner_id:
+            raise UserError(f"Cannot create credit note for members {', '.join(members.mapped('name'))}. Ensure the policy has a valid Related Contact assigned.")
+        lines = self._prepare_refund_lines(members, self._get_income_account())
+        if not lines:
+            return self.env["account.move"]
+
+        credit_note = self.env["account.move"].create({
+            "move_type": "out_refund",
+            "partner_id": self.partner_id.id,
+            "invoice_line_ids": lines,
             "insurance_policy_id": self.id,
         })
         credit_note.action_post()
-        _logger.info(f"Credit note {credit_note.name} created for member {member.name} in policy {self.name} with refund amount {refund_amount}.")
+        _logger.info(f"Credit note {credit_note.name} created in policy {self.name} for {len(lines)} deleted members.")
+        return credit_note
+
+    def _create_credit_note_for_member(self, member):
+        credit_note = self._create_credit_note_for_members(member)
+        if not credit_note:
+            return False
         return {
             'type': 'ir.actions.act_window',
             'res_model': 'account.move',
@@ -355,19 +507,47 @@ class InsurancePolicy(models.Model):
             "res_id": self.claim_id.id,
         }
 
-    # def _send_policy_renewal_reminders(self):
-    #     from dateutil.relativedelta import relativedelta  # Import here to avoid circular imports
-    #     today = fields.Date.today()
-    #     intervals = [60, 40, 30]
-    #     for days_before in intervals:
-    #         target_date = today + relativedelta(days=days_before)
-    #         policies = self.search([('end_date', '=', target_date), ('state', '=', 'active')])
-    #         for policy in policies:
-    #             if not policy.partner_id.email:
-    #                 continue
-    #             template = self.env.ref('innovus_brokerage.email_template_policy_renewal_reminder', raise_if_not_found=False)
-    #             if template:
-    #                 template.send_mail(policy.id, force_send=True)
+    @api.model
+    def _send_policy_renewal_reminders(self):
+        """
+        Queue renewal reminders for active policies ending in 60, 40 or 30 days. All
+        intervals are covered by one indexed query on ``end_date``, each client gets one
+        mail listing all their due policies, and every reminder is logged so that running
+        the job twice does not remind a client twice.
+        """
+        today = fields.Date.today()
+        intervals = {today + relativedelta(days=days): days for days in RENEWAL_REMINDER_DAYS}
+        policies = self.search([('end_date', 'in', list(intervals)), ('state', '=', 'active')])
+        if not policies:
+            return
+        Reminder = self.env['insurance.policy.renewal.reminder']
+        already_sent = {
+            (reminder.policy_id.id, reminder.days_before, reminder.end_date)
+            for reminder in Reminder.search([('policy_id', 'in', policies.ids), ('end_date', 'in', list(intervals))])
+        }
+        policy_ids_by_partner = {}
+        for partner, partner_policies in policies.grouped('partner_id').items():
+            if not partner.email:
+                _logger.info(f"Skipping renewal reminders for {partner.name}: no email address.")
+                continue
+            due_ids = [
+                policy.id for policy in partner_policies
+                if (policy.id, intervals[policy.end_date], policy.end_date) not in already_sent
+            ]
+            if due_ids:
+                policy_ids_by_partner[partner.id] = due_ids
+        if not policy_ids_by_partner:
+            return
+        # One mail per client, listing the policies passed through the rendering context
+        template = self.env.ref('insurance_management.email_template_policy_renewal_reminder')
+        template.with_context(renewal_policy_ids=policy_ids_by_partner).send_mail_batch(list(policy_ids_by_partner), force_send=False)
+        to_remind = self.browse([policy_id for policy_ids in policy_ids_by_partner.values() for policy_id in policy_ids])
+        Reminder.create([{
+            'policy_id': policy.id,
+            'days_before': intervals[policy.end_date],
+            'end_date': policy.end_date,
+        } for policy in to_remind])
+        _logger.info(f"Queued renewal reminders for {len(to_remind)} policies to {len(policy_ids_by_partner)} clients.")
 
     def action_create_cr_report(self):
         self.ensure_one()
@@ -381,4 +561,19 @@ class InsurancePolicy(models.Model):
         }
 
 
-    
\ No newline at end of file
+    
+
+
+class InsurancePolicyRenewalReminder(models.Model):
+    _name = 'insurance.policy.renewal.reminder'
+    _description = 'Policy Renewal Reminder Log'
+    _order = 'sent_date desc, id desc'
+
+    policy_id = fields.Many2one('insurance.policy', string='Policy', required=True, ondelete='cascade', index=True)
+    days_before = fields.Integer(string='Days Before End', required=True)
+    end_date = fields.Date(string='Policy End Date', required=True)
+    sent_date = fields.Date(string='Sent On', required=True, default=fields.Date.today)
+
+    _sql_constraints = [
+        ('unique_reminder', 'unique(policy_id, days_before, end_date)', 'A renewal reminder is only sent once per policy, interval and end date.'),
+    ]
@@ -0,0 +1,268 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+import logging
+
+
+_logger = logging.getLogger(__name__)
+
+MEMBER_VALUE_FIELDS = ('name', 'age', 'id_no', 'email', 'phone', 'gender', 'date_of_birth', 'unique_identifier', 'relation_type')
+
+
+class InsurancePolicyEndorsement(models.Model):
+    _name = 'insurance.policy.endorsement'
+    _description = 'Policy Endorsement'
+    _inherit = ['mail.thread']
+    _order = 'id desc'
+
+    name = fields.Char(string='Reference', required=True, copy=False, readonly=True, default='New')
+    policy_id = fields.Many2one('insurance.policy', string='Policy', required=True, index=True, ondelete='cascade')
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('applied', 'Applied'),
+        ('cancelled', 'Cancelled'),
+    ], string='Status', default='draft', required=True, tracking=True)
+    line_ids = fields.One2many('insurance.policy.endorsement.line', 'endorsement_id', string='Changes', copy=True)
+    move_id = fields.Many2one('account.move', string='Endorsement Invoice', readonly=True, copy=False,
+                              help='Invoice or credit note billing the net premium of the applied changes.')
+    applied_date = fields.Datetime(string='Applied On', readonly=True, copy=False)
+    addition_count = fields.Integer(string='Additions', compute='_compute_change_counts')
+    deletion_count = fields.Integer(string='Deletions', compute='_compute_change_counts')
+    relation_count = fields.Integer(string='Relation Changes', compute='_compute_change_counts')
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            if vals.get('name', 'New') == 'New':
+                vals['name'] = self.env['ir.sequence'].next_by_code('insurance.policy.endorsement') or 'New'
+        return super().create(vals_list)
+
+    @api.depends('line_ids.change_type')
+    def _compute_change_counts(self):
+        for endorsement in self:
+            change_types = endorsement.line_ids.mapped('change_type')
+            endorsement.addition_count = change_types.count('add')
+            endorsement.deletion_count = change_types.count('delete')
+            endorsement.relation_count = change_types.count('relation')
+
+    def action_apply(self):
+        for endorsement in self:
+            endorsement._apply()
+        if len(self) == 1 and self.move_id:
+            return {
+                'type': 'ir.actions.act_window',
+                'res_model': 'account.move',
+                'view_mode': 'form',
+                'res_id': self.move_id.id,
+                'target': 'current',
+            }
+        return True
+
+    def action_cancel(self):
+        if self.filtered(lambda e: e.state == 'applied'):
+            raise UserError('Applied endorsements cannot be cancelled.')
+        self.write({'state': 'cancelled'})
+
+    def action_draft(self):
+        self.filtered(lambda e: e.state == 'cancelled').write({'state': 'draft'})
+
+    def _apply(self):
+        """
+        Apply every staged change of the endorsement as one batch: additions, relation changes
+        and deletions are written with grouped creates and writes, the affected families are
+        re-rated in a single recompute pass, and the net premium is billed on one move.
+        """
+        self.ensure_one()
+        policy = self.policy_id
+        if self.state != 'draft':
+            raise UserError(f'Endorsement {self.name} has already been processed.')
+        if policy.state not in ('draft', 'active'):
+            raise UserError(f'Endorsements cannot be applied to policy {policy.name} in state {policy.state}.')
+        if not self.line_ids:
+            raise UserError(f'Endorsement {self.name} has no changes to apply.')
+        self.line_ids._check_applicable()
+
+        Member = self.env['insurance.policy.member'].with_context(insurance_endorsement=True)
+        additions = self.line_ids.filtered(lambda l: l.change_type == 'add')
+        relation_changes = self.line_ids.filtered(lambda l: l.change_type == 'relation')
+        deletions = self.line_ids.filtered(lambda l: l.change_type == 'delete')
+
+        # Principals first, so dependents staged in the same batch can point to them
+        added_members = Member.browse()
+        new_principals = additions.filtered(lambda l: not l.principal_line_id)
+        for lines in (new_principals, additions - new_principals):
+            if not lines:
+                continue
+            members = Member.create([line._prepare_member_vals() for line in lines])
+            for line, member in zip(lines, members):
+                line.member_id = member
+            added_members |= members
+
+        for (relation_type, principal), lines in relation_changes.grouped(
+            lambda l: (l.relation_type, l.principal_member_id or l.principal_line_id.member_id)
+        ).items():
+            lines.member_id.with_context(insurance_endorsement=True).write({
+                'relation_type': relation_type,
+                'principal_member_id': principal.id,
+            })
+
+        deleted_members = deletions.member_id
+        refundable = deleted_members._get_refundable_members()
+        deleted_members.with_context(insurance_endorsement=True).unlink()
+
+        # Single re-rating pass over every family touched by the batch
+        with self.env['insurance.perf.log']._measure('endorsement_apply', added_members | relation_changes.member_id | deleted_members):
+            self.env.flush_all()
+
+        move = self._create_endorsement_move(added_members, refundable)
+        self.write({
+            'state': 'applied',
+            'move_id': move.id,
+            'applied_date': fields.Datetime.now(),
+        })
+        policy.message_post(
+            body=f"Endorsement {self.name} applied: {len(added_members)} additions, "
+                 f"{len(relation_changes)} relation changes, {len(deleted_members)} deletions."
+        )
+        _logger.info(f"Endorsement {self.name} applied on policy {policy.name} with {len(self.line_ids)} changes.")
+
+    def _create_endorsement_move(self, added_members, refundable):
+        """
+        Bill the premium of ``added_members`` and refund ``refundable`` on a single move: an
+        invoice when the additions outweigh the refunds, a credit note otherwise.
+        """
+        self.ensure_one()
+        policy = self.policy_id
+        if policy.state != 'active':
+            # Members of draft policies are billed by the policy's first invoice
+            return self.env['account.move']
+        account = policy._get_income_account()
+        invoice_date = fields.Date.today()
+
+        addition_lines, member_lines, locked_premiums = [], [], {}
+        if added_members and policy.payment_type == 'broker':
+            invoice_vals, locked_premiums = policy._prepare_invoice_vals(added_members, account, invoice_date)
+            addition_lines = invoice_vals['invoice_line_ids']
+            member_lines = invoice_vals['insurance_member_line_ids']
+        refund_lines = policy._prepare_refund_lines(refundable, account) if refundable else []
+        if not addition_lines and not refund_lines:
+            return self.env['account.move']
+
+        addition_total = sum(vals['quantity'] * vals['price_unit'] for _command, _id, vals in addition_lines)
+        refund_total = sum(vals['quantity'] * vals['price_unit'] for _command, _id, vals in refund_lines)
+        if addition_total >= refund_total:
+            move_type, lines = 'out_invoice', addition_lines + self._negate_lines(refund_lines)
+        else:
+            move_type, lines = 'out_refund', refund_lines + self._negate_lines(addition_lines)
+            # Additions charged on a credit note: sign their breakdown like their lines
+            member_lines = [(0, 0, dict(vals, amount=-vals['amount'])) for _command, _id, vals in member_lines]
+
+        policy._write_locked_premiums(locked_premiums)
+        move = self.env['account.move'].create({
+            'move_type': move_type,
+            'partner_id': policy.partner_id.id,
+            'invoice_line_ids': lines,
+            'insurance_policy_id': policy.id,
+            'invoice_date': invoice_date,
+            'insurance_member_line_ids': member_lines,
+            'ref': self.name,
+        })
+        move.action_post()
+        return move
+
+    @api.model
+    def _negate_lines(self, lines):
+        # Netted lines are not the member's own premium: unlinked, so the member's paid
+        # invoices (used to prorate refunds) never include a credit or a refund
+        return [
+            (0, 0, dict(vals, price_unit=-vals['price_unit'], insurance_policy_member_id=False))
+            for _command, _id, vals in lines
+        ]
+
+
+class InsurancePolicyEndorsementLine(models.Model):
+    _name = 'insurance.policy.endorsement.line'
+    _description = 'Policy Endorsement Change'
+
+    endorsement_id = fields.Many2one('insurance.policy.endorsement', string='Endorsement', required=True, index=True, ondelete='cascade')
+    policy_id = fields.Many2one(related='endorsement_id.policy_id')
+    change_type = fields.Selection([
+        ('add', 'Addition'),
+        ('delete', 'Deletion'),
+        ('relation', 'Relation Change'),
+    ], string='Change', required=True, default='add')
+    member_id = fields.Many2one('insurance.policy.member', string='Member',
+                                domain="[('policy_id', '=', policy_id)]",
+                                help='Member deleted or re-linked by the change, or the member created by an addition.')
+    name = fields.Char(string='Member Name')
+    age = fields.Integer(string='Age')
+    id_no = fields.Char(string='ID Number')
+    email = fields.Char(string='Email')
+    phone = fields.Char(string='Phone')
+    gender = fields.Selection([('male', 'Male'), ('female', 'Female'), ('other', 'Other')], string='Gender')
+    date_of_birth = fields.Date(string='Date of Birth')
+    unique_identifier = fields.Char(string='Unique Identifier')
+    relation_type = fields.Selection([
+        ('principal', 'Principal'),
+        ('spouse', 'Spouse'),
+        ('child', 'Child'),
+        ('newborn', 'Newborn'),
+        ('other', 'Other'),
+    ], string='Relation Type', default='principal')
+    principal_member_id = fields.Many2one('insurance.policy.member', string='Principal Member',
+                                          domain="[('policy_id', '=', policy_id), ('principal_member_id', '=', False)]")
+    principal_line_id = fields.Many2one('insurance.policy.endorsement.line', string='Principal Added In Batch',
+                                        domain="[('endorsement_id', '=', endorsement_id), ('change_type', '=', 'add'), ('relation_type', '=', 'principal')]",
+                                        help='Principal added by this endorsement, for dependents added together with it.')
+
+    def _check_applicable(self):
+        deleted = self.filtered(lambda l: l.change_type == 'delete').member_id
+        relation_changes = self.filtered(lambda l: l.change_type == 'relation')
+        # Principal of each re-linked member once the batch is applied, False for new principals
+        new_principals = {
+            line.member_id: line.principal_member_id or line.principal_line_id.member_id
+            for line in relation_changes
+        }
+        for line in self:
+            if line.change_type == 'add':
+                if not line.name or not line.unique_identifier:
+                    raise UserError('Additions require a member name and a unique identifier.')
+            elif not line.member_id or line.member_id.policy_id != line.policy_id:
+                raise UserError(f'Change on line "{line.name or line.member_id.name}" must reference a member of policy {line.policy_id.name}.')
+            if line.change_type == 'delete':
+                continue
+            name = line.name or line.member_id.name
+            has_principal = bool(line.principal_member_id or line.principal_line_id)
+            if line.relation_type == 'principal' and has_principal:
+                raise UserError(f'Member {name} cannot be a principal and be linked to a principal.')
+            if line.relation_type != 'principal' and not has_principal:
+                raise UserError(f'Dependent {name} must be linked to a principal member.')
+            if line.principal_line_id and line.principal_line_id.endorsement_id != line.endorsement_id:
+                raise UserError(f'Dependent {name} is linked to an addition of another endorsement.')
+            if line.principal_line_id.principal_line_id or line.principal_member_id in deleted:
+                raise UserError(f'Dependent {name} is linked to a principal that is not kept by this endorsement.')
+            principal = line.principal_member_id
+            if principal:
+                if line.member_id and principal == line.member_id:
+                    raise UserError(f'Member {name} cannot be its own principal.')
+                is_dependent = new_principals[principal] if principal in new_principals else principal.principal_member_id
+                if is_dependent:
+                    raise UserError(f'Member {principal.name} is a dependent and cannot be the principal of {name}.')
+            if line.change_type == 'relation' and line.relation_type != 'principal' and not line.member_id.principal_member_id:
+                remaining = line.member_id.linked_dependent_ids.filtered(
+                    lambda d: d not in deleted and new_principals.get(d, line.member_id) == line.member_id
+                )
+                if remaining:
+                    raise UserError(
+                        f'Principal {name} still has dependents ({", ".join(remaining.mapped("name"))}) '
+                        'and cannot become a dependent. Delete or re-link them in the same endorsement.'
+                    )
+
+    def _prepare_member_vals(self):
+        self.ensure_one()
+        vals = {field_name: self[field_name] for field_name in MEMBER_VALUE_FIELDS}
+        vals.update({
+            'policy_id': self.policy_id.id,
+            'principal_member_id': (self.principal_member_id or self.principal_line_id.member_id).id,
+            'state': 'pending',
+        })
+        return vals
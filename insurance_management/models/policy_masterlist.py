@@ -1,9 +1,24 @@
 from odoo import models, fields, api
 from odoo.exceptions import UserError
-import base64
-from io import BytesIO
 import xlsxwriter
-from dateutil.relativedelta import relativedelta
+
+from .perf_log import profiled
+
+CATEGORY_NAMES = {
+    'initial': 'Initial Members',
+    'additions': 'Additions',
+    'deletions': 'Deletions',
+    'active': 'Active Members',
+}
+EXPORT_HEADERS = [
+    'Principal Member', 'Relation Type', 'Name', 'Contact', 'ID Number', 'Email',
+    'Phone', 'Age', 'Band Label', 'Premium', 'State', 'Activation Date', 'Deletion Date'
+]
+EXPORT_FIELDS = [
+    'principal_member_id', 'relation_type', 'name', 'partner_id', 'id_no', 'email',
+    'phone', 'age', 'band_label', 'premium', 'state', 'activation_date', 'deletion_date',
+]
+EXPORT_BATCH_SIZE = 1000
 
 class InsurancePolicyMasterlist(models.Model):
     _name = 'insurance.policy.masterlist'
@@ -26,119 +41,207 @@ class InsurancePolicyMasterlist(models.Model):
 
     @api.depends('policy_id', 'policy_id.member_ids', 'policy_id.deleted_ids')
     def _compute_members(self):
+        """Fill each category with an indexed query on the members' stored masterlist period and state."""
+        Member = self.env['insurance.policy.member']
         for record in self:
             if not record.policy_id:
-                record.initial_member_ids = [(5, 0, 0)]
-                record.addition_member_ids = [(5, 0, 0)]
-                record.deletion_member_ids = [(5, 0, 0)]
-                record.active_member_ids = [(5, 0, 0)]
-                return
-
-            policy_activation = record.policy_id.active_date or False
-            all_members = record.policy_id.member_ids | record.policy_id.deleted_ids
-
-            # Initial Members: Members with activation_date same as policy activation date
-            initial_members = all_members.filtered(
-                lambda m: m.activation_date and policy_activation and
-                m.activation_date <= policy_activation + relativedelta(seconds=1)
-            )
-
-            # Additions: Members added after policy activation
-            addition_members = all_members.filtered(
-                lambda m: m.activation_date and policy_activation and
-                m.activation_date > policy_activation + relativedelta(seconds=1)
-            )
-
+                record.initial_member_ids = Member
+                record.addition_member_ids = Member
+                record.deletion_member_ids = Member
+                record.active_member_ids = Member
+                continue
+
+            record.initial_member_ids = Member.search(record._get_category_domain('initial'))
+            record.addition_member_ids = Member.search(record._get_category_domain('additions'))
+            record.deletion_member_ids = Member.search(record._get_category_domain('deletions'))
+            record.active_member_ids = Member.search(record._get_category_domain('active'))
+
+    def _get_category_domain(self, category):
+        """Domain of the members of a masterlist category."""
+        self.ensure_one()
+        all_members = self._get_all_members_domain()
+        if category == 'initial':
+            # Initial Members: activated together with the policy
+            return all_members + [('masterlist_period', '=', 'initial')]
+        if category == 'additions':
+            # Additions: activated after the policy
+            return all_members + [('masterlist_period', '=', 'addition')]
+        if category == 'deletions':
             # Deletions: Members with state 'deleted'
-            deletion_members = all_members.filtered(lambda m: m.state == 'deleted')
+            return all_members + [('state', '=', 'deleted')]
+        # Active Members: Members with state 'active'
+        return [('policy_id', '=', self.policy_id.id), ('state', '=', 'active')]
 
-            # Active Members: Members with state 'active'
-            active_members = record.policy_id.member_ids.filtered(lambda m: m.state == 'active')
-
-            record.initial_member_ids = [(6, 0, initial_members.ids)]
-            record.addition_member_ids = [(6, 0, addition_members.ids)]
-            record.deletion_member_ids = [(6, 0, deletion_members.ids)]
-            record.active_member_ids = [(6, 0, active_members.ids)]
+    def _get_all_members_domain(self):
+        self.ensure_one()
+        return ['|', ('policy_id', '=', self.policy_id.id), ('deleted_policy_id', '=', self.policy_id.id)]
+
+    def _get_member_categories(self, member):
+        """Categories of a member, evaluated in memory with the same rules as the category domains."""
+        categories = []
+        if member.masterlist_period == 'initial':
+            categories.append('initial')
+        elif member.masterlist_period == 'addition':
+            categories.append('additions')
+        if member.state == 'deleted':
+            categories.append('deletions')
+        if member.state == 'active' and member.policy_id == self.policy_id:
+            categories.append('active')
+        return categories
 
     def action_export_excel(self, category=None):
-        """Export the specified category to an Excel file."""
+        """Export the specified category to an Excel file, streamed by the masterlist export controller."""
         self.ensure_one()
 
         # Fetch category from context if not passed as argument
         if not category:
             category = self.env.context.get('category')
-            if not category or category not in ['initial', 'additions', 'deletions', 'active']:
-                raise UserError("No valid category specified for export. Please select a valid category (Initial Members, Additions, Deletions, or Active Members).")
-
-        # Map category to field and report name
-        category_map = {
-            'initial': ('initial_member_ids', 'Initial Members'),
-            'additions': ('addition_member_ids', 'Additions'),
-            'deletions': ('deletion_member_ids', 'Deletions'),
-            'active': ('active_member_ids', 'Active Members'),
+            if not category or category not in self._get_export_categories():
+                raise UserError("No valid category specified for export. Please select a valid category (Initial Members, Additions, Deletions, Active Members or All Categories).")
+
+        if category == 'all':
+            if not self.env['insurance.policy.member'].search_count(self._get_all_members_domain(), limit=1):
+                raise UserError("No members found on this policy.")
+        else:
+            report_name = CATEGORY_NAMES[category]
+            if not self.env['insurance.policy.member'].search_count(self._get_category_domain(category), limit=1):
+                raise UserError(f"No members found in the {report_name} category.")
+
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/insurance/masterlist/{self.id}/export/{category}',
+            'target': 'self',
         }
-        member_field, report_name = category_map[category]
-        members = self[member_field]
-
-        if not members:
-            raise UserError(f"No members found in the {report_name} category.")
-
-        # Prepare data for Excel, including new fields
-        data = [{
-            'Principal Member': member.principal_member_id.name or '',
-            'Relation Type': member.relation_type,
-            'Name': member.name,
-            'Contact': member.partner_id.name or '',
-            'ID Number': member.id_no or '',
-            'Email': member.email or '',
-            'Phone': member.phone or '',
-            'Age': member.age,
-            'Band Label': member.band_label or '',
-            'Premium': member.premium,
-            'State': member.state,
-            'Activation Date': member.activation_date.strftime('%Y-%m-%d %H:%M:%S') if member.activation_date else '',
-            'Deletion Date': member.deletion_date.strftime('%Y-%m-%d %H:%M:%S') if member.deletion_date else '',
-        } for member in members]
-
-        # Generate Excel file
-        output = BytesIO()
-        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
-        worksheet = workbook.add_worksheet(report_name)
-
-        # Define header format (bold, centered)
-        header_format = workbook.add_format({'bold': True, 'bg_color': '#D9E1F2', 'border': 1})
-        cell_format = workbook.add_format({'text_wrap': True, 'border': 1})
-
-        # Headers
-        headers = [
-            'Principal Member', 'Relation Type', 'Name', 'Contact', 'ID Number', 'Email',
-            'Phone', 'Age', 'Band Label', 'Premium', 'State', 'Activation Date', 'Deletion Date'
-        ]
-        for col, header in enumerate(headers):
-            worksheet.write(0, col, header, header_format)
-            # Optionally set initial width based on header length
-            worksheet.set_column(col, col, len(header) + 5)
 
-        # Write data rows with cell format
-        for row, record in enumerate(data, start=1):
-            for col, key in enumerate(headers):
-                value = record.get(key, '')
-                worksheet.write(row, col, value, cell_format)
+    @api.model
+    def _get_export_categories(self):
+        return list(CATEGORY_NAMES) + ['all']
 
-        workbook.close()
-        output.seek(0)
+    def _get_export_filename(self, category):
+        self.ensure_one()
+        if category == 'all':
+            return f"{self.policy_id.name}_Masterlist.xlsx"
+        return f"{self.policy_id.name}_{CATEGORY_NAMES[category].replace(' ', '_')}.xlsx"
 
-        # Create report action
-        report = self.env['ir.attachment'].create({
-            'name': f"{self.policy_id.name}_{report_name.replace(' ', '_')}.xlsx",
-            'type': 'binary',
-            'datas': base64.b64encode(output.read()),
-            'res_model': self._name,
-            'res_id': self.id,
-        })
+    def _iter_export_rows(self, category):
+        """Yield the export rows of a category, reading members with batched ``search_read`` calls."""
+        self.ensure_one()
+        Member = self.env['insurance.policy.member']
+        domain = self._get_category_domain(category)
+        offset = 0
+        while True:
+            records = Member.search_read(domain, EXPORT_FIELDS, offset=offset, limit=EXPORT_BATCH_SIZE, order='id')
+            if not records:
+                return
+            for member in records:
+                yield [
+                    member['principal_member_id'][1] if member['principal_member_id'] else '',
+                    member['relation_type'],
+                    member['name'],
+                    member['partner_id'][1] if member['partner_id'] else '',
+                    member['id_no'] or '',
+                    member['email'] or '',
+                    member['phone'] or '',
+                    member['age'],
+                    member['band_label'] or '',
+                    member['premium'],
+                    member['state'],
+                    member['activation_date'].strftime('%Y-%m-%d %H:%M:%S') if member['activation_date'] else '',
+                    member['deletion_date'].strftime('%Y-%m-%d %H:%M:%S') if member['deletion_date'] else '',
+                ]
+            offset += EXPORT_BATCH_SIZE
+            # Drop the batch from the ORM cache to keep memory flat on large masterlists
+            self.env.invalidate_all()
+
+    @profiled('action_export_excel', rows=lambda masterlist, member_count: member_count)
+    def _write_export_excel(self, category, fileobj):
+        """
+        Write the category export to ``fileobj`` and return the number of members exported.
+        xlsxwriter runs in ``constant_memory`` mode, which flushes every row to a temporary
+        file as soon as the next one starts.
+        """
+        self.ensure_one()
+        if category == 'all':
+            return self._write_combined_export_excel(fileobj)
+        workbook = xlsxwriter.Workbook(fileobj, {'constant_memory': True})
+        formats = self._add_export_formats(workbook)
+        member_count = self._write_export_sheet(workbook, formats, CATEGORY_NAMES[category], self._iter_export_rows(category))
+        workbook.close()
+        return member_count
 
+    @api.model
+    def _add_export_formats(self, workbook):
         return {
-            'type': 'ir.actions.act_url',
-            'url': f'/web/content/{report.id}?download=true',
-            'target': 'self',
-        }
\ No newline at end of file
+            # Define header format (bold, centered)
+            'header': workbook.add_format({'bold': True, 'bg_color': '#D9E1F2', 'border': 1}),
+            'cell': workbook.add_format({'text_wrap': True, 'border': 1}),
+        }
+
+    @api.model
+    def _write_export_sheet(self, workbook, formats, sheet_name, rows, headers=EXPORT_HEADERS):
+        worksheet = workbook.add_worksheet(sheet_name)
+        for col, header in enumerate(headers):
+            # Set initial width based on header length
+            worksheet.set_column(col, col, len(header) + 5)
+            worksheet.write(0, col, header, formats['header'])
+        row = 0
+        for row, values in enumerate(rows, start=1):
+            worksheet.write_row(row, 0, values, formats['cell'])
+        return row
+
+    @api.model
+    def _prepare_export_row(self, member):
+        return [
+            member.principal_member_id.name or '',
+            member.relation_type,
+            member.name,
+            member.partner_id.name or '',
+            member.id_no or '',
+            member.email or '',
+            member.phone or '',
+            member.age,
+            member.band_label or '',
+            member.premium,
+            member.state,
+            member.activation_date.strftime('%Y-%m-%d %H:%M:%S') if member.activation_date else '',
+            member.deletion_date.strftime('%Y-%m-%d %H:%M:%S') if member.deletion_date else '',
+        ]
+
+    def _write_combined_export_excel(self, fileobj):
+        """
+        Write the four categories as sheets of one workbook, plus a summary of member counts and
+        premiums per band, and return the number of members exported. Members are fetched once with a single ``search_fetch``; principals
+        and contacts are then read in one prefetch query each.
+        """
+        self.ensure_one()
+        members = self.env['insurance.policy.member'].search_fetch(
+            self._get_all_members_domain(),
+            EXPORT_FIELDS + ['masterlist_period', 'policy_id'],
+            order='id',
+        )
+        rows = {category: [] for category in CATEGORY_NAMES}
+        summary = {}
+        for member in members:
+            row = self._prepare_export_row(member)
+            # Dependents are summarised under their family's band
+            band = member.band_label or member.principal_member_id.band_label or ''
+            for category in self._get_member_categories(member):
+                rows[category].append(row)
+                totals = summary.setdefault(band, {key: [0, 0.0] for key in CATEGORY_NAMES})
+                totals[category][0] += 1
+                totals[category][1] += member.premium
+
+        workbook = xlsxwriter.Workbook(fileobj, {'constant_memory': True})
+        formats = self._add_export_formats(workbook)
+        summary_headers = ['Band'] + [
+            f"{name} {measure}" for name in CATEGORY_NAMES.values() for measure in ('Count', 'Premium')
+        ]
+        summary_rows = [
+            [band] + [value for category in CATEGORY_NAMES for value in summary[band][category]]
+            for band in sorted(summary, key=lambda label: (len(label), label))
+        ]
+        self._write_export_sheet(workbook, formats, 'Summary', summary_rows, headers=summary_headers)
+        for category, sheet_name in CATEGORY_NAMES.items():
+            self._write_export_sheet(workbook, formats, sheet_name, rows[category])
+        workbook.close()
+        return len(members)
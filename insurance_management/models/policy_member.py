@@ -1,9 +1,11 @@
 from odoo import models, fields, api
 from odoo.exceptions import UserError
-from datetime import timedelta, datetime
+from datetime import timedelta
 from dateutil.relativedelta import relativedelta
 import logging
 
+from ..tools.proration import prorate
+
 
 _logger = logging.getLogger(__name__)
 
@@ -23,13 +25,14 @@ class InsurancePolicyMember(models.Model):
     premium = fields.Float(string='Premium', compute='_compute_premium', store=True, digits=(16, 2))
     locked_premium = fields.Float(string='Locked Premium', readonly=True, digits=(16, 2), help='Premium set at invoice creation, used for active members.')
     currency_id = fields.Many2one('res.currency', related='policy_id.insurer_id.currency_id', readonly=True)
-    state = fields.Selection([('pending', 'Pending'), ('active', 'Active'), ('deleted', 'Deleted')], default='pending', track_visibility='onchange')
-    policy_id = fields.Many2one('insurance.policy', string='Policy')
-    deleted_policy_id = fields.Many2one('insurance.policy', string='Deleted From Policy')
+    state = fields.Selection([('pending', 'Pending'), ('active', 'Active'), ('deleted', 'Deleted')], default='pending', track_visibility='onchange', index=True)
+    policy_id = fields.Many2one('insurance.policy', string='Policy', index=True)
+    deleted_policy_id = fields.Many2one('insurance.policy', string='Deleted From Policy', index=True)
     deletion_date = fields.Datetime(string='Deletion Date', readonly=True)
     creation_date = fields.Datetime(string='Creation Date', readonly=True, help='Date when the member transitioned to Active state')
     partner_id = fields.Many2one('res.partner', string='Contact', domain=[('is_insurer', '=', False)], help='Linked contact for this member')
     invoice_line_ids = fields.One2many('account.move.line', 'insurance_policy_member_id', string='Invoice Lines', readonly=True)
+    invoice_detail_ids = fields.One2many('insurance.invoice.member.line', 'member_id', string='Grouped Invoice Lines', readonly=True)
     activation_date = fields.Datetime(string='Activation Date', )
     principal_member_id = fields.Many2one('insurance.policy.member', string='Principal Member', domain="[('policy_id', '=', policy_id), ('id', '!=', id)]", help='The principal member this record is linked to, if a dependent.')
     linked_dependent_ids = fields.One2many('insurance.policy.member', 'principal_member_id', string='Linked Dependents', domain="[('state', '!=', 'deleted')]", help='Members linked to this principal member.')
@@ -44,6 +47,11 @@ class InsurancePolicyMember(models.Model):
     initially_active = fields.Boolean(compute='_compute_change_flags', store=False)
     added_after_activation = fields.Boolean(compute='_compute_change_flags', store=False)
     deleted_in_period = fields.Boolean(compute='_compute_change_flags', store=False)
+    masterlist_period = fields.Selection([
+        ('initial', 'Initial'),
+        ('addition', 'Addition'),
+    ], string='Masterlist Period', compute='_compute_masterlist_period', store=True, index=True,
+        help='Whether the member was activated with the policy or added after its activation.')
 
 
     gender = fields.Selection([('male', 'Male'), ('female', 'Female'), ('other', 'Other')], string='Gender')
@@ -129,6 +137,17 @@ class InsurancePolicyMember(models.Model):
                     and self._context['start_dt'] <= member.deletion_date <= self._context['end_dt']
                 )
 
+    @api.depends('activation_date', 'policy_id.active_date', 'deleted_policy_id.active_date')
+    def _compute_masterlist_period(self):
+        for member in self:
+            policy_activation = (member.policy_id or member.deleted_policy_id).active_date
+            if not member.activation_date or not policy_activation:
+                member.masterlist_period = False
+            elif member.activation_date <= policy_activation + timedelta(seconds=1):
+                member.masterlist_period = 'initial'
+            else:
+                member.masterlist_period = 'addition'
+
     @api.depends('linked_dependent_ids', 'linked_dependent_ids.state')
     def _compute_dependent_count(self):
         for member in self:
@@ -160,104 +179,99 @@ class InsurancePolicyMember(models.Model):
             else:
                 member.dependent_count = 0
 
-    @api.depends('dependent_count', 'policy_id.rate_table_id', 'deleted_policy_id.rate_table_id', 'principal_member_id', 'creation_date', 'policy_id.end_date', 'deleted_policy_id.end_date', 'state', 'invoice_line_ids')
+    @api.depends('dependent_count', 'policy_id.rate_table_id', 'deleted_policy_id.rate_table_id', 'principal_member_id', 'creation_date', 'policy_id.end_date', 'deleted_policy_id.end_date', 'state', 'invoice_line_ids', 'invoice_detail_ids')
     def _compute_premium(self):
-        for member in self:
-            # Determine policy and rate table
-            policy = member.policy_id or member.deleted_policy_id
-            rate_table = policy.rate_table_id if policy else False
-            if not rate_table or not hasattr(rate_table, 'get_inpatient_premium') or not hasattr(rate_table, 'get_outpatient_premium'):
-                member.premium = 0.0
+        """
+        Batched premium engine: members are grouped by rate table, each table's bands are
+        loaded once into a lookup and each principal's dependent count is counted once,
+        instead of scanning bands and dependents again for every member.
+        """
+        now = fields.Datetime.now()
+        dependent_counts = {}
+        full_premiums = {}
+        for rate_table, members in self.grouped(lambda m: (m.policy_id or m.deleted_policy_id).rate_table_id).items():
+            if not rate_table:
+                members.premium = 0.0
                 continue
+            bands = rate_table._get_band_premiums()
 
-            # Get policy dates
-            active_date = policy.active_date
-            end_date = policy.end_date
-
-            # Calculate full premium
-            if not member.principal_member_id:
-                # Principal member: Use base 'M' premium
-                full_premium = (
-                    rate_table.get_inpatient_premium(0) +
-                    rate_table.get_outpatient_premium(0)
-                )
-            else:
-                # Dependent: Calculate premium as difference between bands
-                principal = member.principal_member_id
-                dependent_count = len(principal.linked_dependent_ids.filtered(lambda d: d.state != 'deleted'))
-                if dependent_count == 1:
-                    # First dependent: M+1 - M
-                    full_premium = (
-                        (rate_table.get_inpatient_premium(1) - rate_table.get_inpatient_premium(0)) +
-                        (rate_table.get_outpatient_premium(1) - rate_table.get_outpatient_premium(0))
-                    )
+            for member in members:
+                # Calculate full premium
+                if not member.principal_member_id:
+                    # Principal member: Use base 'M' premium
+                    full_premium = self._get_band_total(bands, 0)
                 else:
-                    # Subsequent dependent: M+n - M+(n-1)
-                    full_premium = (
-                        (rate_table.get_inpatient_premium(dependent_count - 1) - rate_table.get_inpatient_premium(dependent_count - 2)) +
-                        (rate_table.get_outpatient_premium(dependent_count - 1) - rate_table.get_outpatient_premium(dependent_count - 2))
-                    )
+                    # Dependent: Calculate premium as difference between bands
+                    principal = member.principal_member_id
+                    if principal not in dependent_counts:
+                        dependent_counts[principal] = sum(1 for d in principal.linked_dependent_ids if d.state != 'deleted')
+                    dependent_count = dependent_counts[principal]
+                    # First dependent: M+1 - M, subsequent dependent: M+n - M+(n-1)
+                    upper = 1 if dependent_count == 1 else dependent_count - 1
+                    full_premium = self._get_band_total(bands, upper) - self._get_band_total(bands, upper - 1)
 
-            # Prorate premium
-            if policy.state == 'active' and active_date and end_date:
-                # Convert end_date (Date) to Datetime for calculation
-                end_datetime = datetime.combine(end_date, datetime.min.time())
-                total_days = (end_datetime - active_date).days
-                if total_days <= 0:
-                    member.premium = 0.0
-                    continue
+                full_premiums[member] = full_premium
 
-                if member.state == 'active' and member.locked_premium:
-                    # Use locked premium from invoice creation
-                    member.premium = member.locked_premium
-                elif member.state == 'pending' and member.added_after_activation:
-                    # Prorate from creation_date for pending members
-                    start_date = member.creation_date or fields.Datetime.now()
-                    if start_date > end_datetime:
-                        member.premium = 0.0
-                    else:
-                        covered_days = (end_datetime - start_date).days
-                        if covered_days > 0:
-                            proration_ratio = covered_days / total_days
-                            member.premium = full_premium * proration_ratio
-                        else:
-                            member.premium = 0.0
-                else:
-                    # Full premium for initially active or deleted members
-                    member.premium = full_premium
-            else:
-                # Full premium for non-active policy or missing dates
-                member.premium = full_premium
+        for member, premium in self._get_prorated_premiums(full_premiums, now).items():
+            member.premium = premium
+
+    @api.model
+    def _get_band_total(self, bands, dependent_count):
+        """Inpatient plus outpatient premium of a band in a ``_get_band_premiums`` lookup."""
+        return sum(bands.get(dependent_count, (0.0, 0.0)))
 
     @api.model
-    def create(self, vals):
-        if not vals.get('partner_id'):
-            partner = False
-            if vals.get('id_no') or vals.get('email') or vals.get('phone'):
-                domain = []
-                if vals.get('id_no'):
-                    domain.append(('id_no', '=', vals['id_no']))
-                if vals.get('email'):
-                    domain.append(('email', '=', vals['email']))
-                if vals.get('phone'):
-                    domain.append(('phone', '=', vals['phone']))
-                if domain:
-                    partner = self.env['res.partner'].search(domain, limit=1)
-                if not partner:
-                    partner_vals = {
-                        'name': vals.get('name', 'New Contact'),
-                        'id_no': vals.get('id_no', False),
-                        'email': vals.get('email', False),
-                        'phone': vals.get('phone', False),
-                        'is_insurer': False,
-                    }
-                    partner = self.env['res.partner'].create(partner_vals)
-                vals['partner_id'] = partner.id
-        if not vals.get('creation_date'):
-            vals['creation_date'] = fields.Datetime.now()
-        if vals.get('state') == 'active' and not vals.get('activation_date'):
-            vals['activation_date'] = fields.Datetime.now()
-        return super(InsurancePolicyMember, self).create(vals)
+    def _get_prorated_premiums(self, full_premiums, now):
+        """
+        Prorate a ``{member: full_premium}`` batch with one call to the shared proration and
+        return the ``{member: premium}`` to store. Pending members added after activation are
+        prorated from their creation date, invoiced active members keep their locked premium
+        and the others pay the full premium.
+        """
+        premiums = {}
+        to_prorate = []
+        for member, full_premium in full_premiums.items():
+            policy = member.policy_id or member.deleted_policy_id
+            if policy.state != 'active' or not policy.active_date or not policy.end_date:
+                # Full premium for non-active policy or missing dates
+                premiums[member] = full_premium
+            elif (policy.end_date - policy.active_date.date()).days <= 0:
+                premiums[member] = 0.0
+            elif member.state == 'active' and member.locked_premium:
+                # Use locked premium from invoice creation
+                premiums[member] = member.locked_premium
+            elif member.state == 'pending' and member.added_after_activation:
+                to_prorate.append(member)
+            else:
+                # Full premium for initially active or deleted members
+                premiums[member] = full_premium
+
+        policies = [member.policy_id or member.deleted_policy_id for member in to_prorate]
+        amounts = prorate(
+            [full_premiums[member] for member in to_prorate],
+            [policy.active_date for policy in policies],
+            [policy.end_date for policy in policies],
+            [member.creation_date or now for member in to_prorate],
+        )
+        premiums.update(zip(to_prorate, amounts.tolist()))
+        return premiums
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        # Resolve the contacts of the whole batch with one lookup and one create
+        contact_vals_list = [
+            vals for vals in vals_list
+            if not vals.get('partner_id') and (vals.get('id_no') or vals.get('email') or vals.get('phone'))
+        ]
+        partners = self.env['res.partner']._get_or_create_member_contacts(contact_vals_list)
+        for vals, partner in zip(contact_vals_list, partners):
+            vals['partner_id'] = partner.id
+        for vals in vals_list:
+            if not vals.get('creation_date'):
+                vals['creation_date'] = fields.Datetime.now()
+            if vals.get('state') == 'active' and not vals.get('activation_date'):
+                vals['activation_date'] = fields.Datetime.now()
+        return super(InsurancePolicyMember, self).create(vals_list)
 
     def write(self, vals):
         for member in self:
@@ -266,29 +280,61 @@ class InsurancePolicyMember(models.Model):
         return super(InsurancePolicyMember, self).write(vals)
 
     def unlink(self):
-        for member in self:
-            principal = member.principal_member_id
-            if member.state == 'active' and member.policy_id and member.policy_id.state == 'active' and (member.premium or member.locked_premium):
-                # Set state to deleted before creating credit note
-                member.write({
-                    'state': 'deleted',
-                    'deletion_date': fields.Datetime.now(),
-                })
-                result = member.policy_id._create_credit_note_for_member(member)
-                if not result:
-                    _logger.info(f"No credit note created for member {member.name}. Proceeding with deletion.")
-            else:
-                member.write({
-                    'state': 'deleted',
-                    'deletion_date': fields.Datetime.now(),
-                })
-            member.write({
+        """
+        Soft-delete members in bulk: state changes are applied with grouped writes and each
+        policy issues one consolidated credit note for all its refundable members.
+        """
+        if not self:
+            return True
+        # Endorsements bill the refunds with the rest of the batch and re-rate the families once
+        in_endorsement = self.env.context.get('insurance_endorsement')
+        refundable = self.browse() if in_endorsement else self._get_refundable_members()
+        principals = self.principal_member_id - self
+        # Set state to deleted before creating credit notes
+        self.write({
+            'state': 'deleted',
+            'deletion_date': fields.Datetime.now(),
+        })
+        for policy, members in refundable.grouped('policy_id').items():
+            if not policy._create_credit_note_for_members(members):
+                _logger.info(f"No credit note created for {len(members)} deleted members of policy {policy.name}. Proceeding with deletion.")
+        for policy, members in self.grouped('policy_id').items():
+            members.write({
                 'policy_id': False,
-                'deleted_policy_id': member.policy_id.id,
+                'deleted_policy_id': policy.id,
             })
-            if principal:
-                principal._compute_dependent_count()
-                principal._compute_band_label()
+        if principals and not in_endorsement:
+            principals._compute_dependent_count()
+            principals._compute_band_label()
+        return True
+
+    def _get_refundable_members(self):
+        """Active members of active policies with a premium, refunded when they are deleted."""
+        return self.filtered(
+            lambda m: m.state == 'active' and m.policy_id and m.policy_id.state == 'active' and (m.premium or m.locked_premium)
+        )
+
+    def _get_paid_invoice_dates(self):
+        """
+        Date of the latest paid customer invoice billing each member, on their own line or on a
+        grouped line, as a ``{member: invoice_date}`` dict read in one batch for the recordset.
+        """
+        paid_domain = [('move_id.move_type', '=', 'out_invoice'), ('move_id.payment_state', '=', 'paid')]
+        invoice_lines = self.env['account.move.line'].search_fetch(
+            [('insurance_policy_member_id', 'in', self.ids)] + paid_domain,
+            ['insurance_policy_member_id', 'move_id'],
+        )
+        detail_lines = self.env['insurance.invoice.member.line'].search_fetch(
+            [('member_id', 'in', self.ids)] + paid_domain,
+            ['member_id', 'move_id'],
+        )
+        invoice_dates = {}
+        links = [(line.insurance_policy_member_id, line.move_id) for line in invoice_lines]
+        links += [(line.member_id, line.move_id) for line in detail_lines]
+        for member, move in links:
+            if move.invoice_date and (member not in invoice_dates or move.invoice_date > invoice_dates[member]):
+                invoice_dates[member] = move.invoice_date
+        return invoice_dates
 
     def action_view_activities(self):
         self.ensure_one()
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields
+from types import MappingProxyType
+
+from odoo import models, fields, tools
 
 class InsuranceRateTable(models.Model):
     _name = 'insurance.rate.table'
@@ -54,24 +56,49 @@ class InsuranceRateTable(models.Model):
 
     currency_id = fields.Many2one('res.currency', related='insurer_id.company_id.currency_id', readonly=True)
     band_ids = fields.One2many('insurance.rate.table.band', 'rate_table_id', string='Premium Bands', copy=True)
+    band_version = fields.Integer(string='Band Version', readonly=True, copy=False,
+                                  help='Incremented whenever a band of the table changes, to refresh the cached band lookup.')
+
+    @tools.ormcache('self.id', 'self.band_version')
+    def _get_band_premiums(self):
+        """
+        Return the table's bands as a read-only ``{dependent_count: (inpatient, outpatient)}``
+        lookup. The index is cached per table version: creating, writing or unlinking a band
+        bumps ``band_version`` of its table only, so the stale entry is never hit again and the
+        rest of the registry cache is kept. Quoting and invoicing do not iterate ``band_ids``.
+        """
+        self.ensure_one()
+        bands = self.env['insurance.rate.table.band'].search_read(
+            [('rate_table_id', '=', self.id)],
+            ['dependent_count', 'inpatient_premium', 'outpatient_premium'],
+        )
+        return MappingProxyType({
+            band['dependent_count']: (band['inpatient_premium'], band['outpatient_premium'])
+            for band in bands
+        })
 
+    def _bump_band_version(self):
+        for rate_table in self:
+            rate_table.band_version += 1
+
+    def get_premiums(self, dependent_counts):
+        """
+        Get the ``(inpatient, outpatient)`` premiums for each of the given dependent counts,
+        in order. Counts without a band get ``(0.0, 0.0)``.
+        """
+        bands = self._get_band_premiums()
+        return [bands.get(count, (0.0, 0.0)) for count in dependent_counts]
 
     def get_inpatient_premium(self, dependent_count):
         """
         Get the inpatient premium based on the dependent count.
         This method should be overridden to implement the actual premium calculation logic.
         """
-        for band in self.band_ids:
-            if band.dependent_count == dependent_count:
-                return band.inpatient_premium
-        return 0.0
+        return self.get_premiums([dependent_count])[0][0]
 
     def get_outpatient_premium(self, dependent_count):
         """
         Get the outpatient premium based on the dependent count.
         This method should be overridden to implement the actual premium calculation logic.
         """
-        for band in self.band_ids:
-            if band.dependent_count == dependent_count:
-                return band.outpatient_premium
-        return 0.0
\ No newline at end of file
+        return self.get_premiums([dependent_count])[0][1]
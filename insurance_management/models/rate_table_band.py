@@ -11,6 +11,24 @@ class InsuranceRateTableBand(models.Model):
     outpatient_premium = fields.Monetary(string='Outpatient Premium', required=True)
     currency_id = fields.Many2one('res.currency', related='rate_table_id.currency_id', readonly=True)
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        bands = super().create(vals_list)
+        bands.rate_table_id._bump_band_version()
+        return bands
+
+    def write(self, vals):
+        rate_tables = self.rate_table_id
+        res = super().write(vals)
+        (rate_tables | self.rate_table_id)._bump_band_version()
+        return res
+
+    def unlink(self):
+        rate_tables = self.rate_table_id
+        res = super().unlink()
+        rate_tables.exists()._bump_band_version()
+        return res
+
     @api.depends('dependent_count')
     def _compute_band_label(self):
         for rec in self:
@@ -0,0 +1 @@
+from . import test_performance, test_premium, test_proration
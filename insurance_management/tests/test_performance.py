@@ -0,0 +1,219 @@
+"""
+Benchmarks of the premium, invoicing, member sync and import flows on synthetic schemes.
+
+They are excluded from the standard test run and selected with the ``insurance_benchmark``
+tag, e.g. ``odoo-bin -d bench -i insurance_management --test-tags insurance_benchmark``.
+The scheme shape and the tolerance of the budgets can be tuned through the environment:
+
+- ``INSURANCE_BENCH_POLICIES``: number of synthetic policies (default 5)
+- ``INSURANCE_BENCH_PRINCIPALS``: principals per policy (default 200)
+- ``INSURANCE_BENCH_DEPENDENTS``: dependents per principal, at most 4 (default 3)
+- ``INSURANCE_BENCH_BANDS``: bands of the rate table (default 6)
+- ``INSURANCE_BENCH_TOLERANCE``: multiplier applied to every budget. When it is set, the
+  elapsed time is asserted too; otherwise it is only logged, as wall-clock time is not
+  reliable on shared CI runners.
+
+Query counts are the hard gate. Each budget is the number of statements the batched flow
+issues, derived for the default scheme (5 policies of 200 principals with 3 dependents each,
+i.e. 4000 lives, on a 6-band rate table): a constant number per policy, rate table or import
+chunk plus the per-row inserts and updates of the member table. ``QUERY_MARGIN`` adds 10% on
+top. Time budgets are indicative and only asserted with a tolerance.
+"""
+import base64
+import io
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import openpyxl
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.tests import tagged
+
+_logger = logging.getLogger(__name__)
+
+# Query budget of each flow: (fixed queries, queries per 100 lives), see the module docstring
+QUERY_BUDGETS = {
+    'compute_premium': (10, 1),
+    'create_invoice': (75, 13),
+    'sync_member_states': (20, 2),
+    'import_members': (100, 30),
+}
+QUERY_MARGIN = 1.1
+# Time budget of each flow, only asserted with INSURANCE_BENCH_TOLERANCE: (fixed seconds, seconds per 1000 lives)
+TIME_BUDGETS = {
+    'compute_premium': (1.0, 2.0),
+    'create_invoice': (2.0, 6.0),
+    'sync_member_states': (1.0, 2.0),
+    'import_members': (3.0, 15.0),
+}
+
+
+def _env_number(name, default, cast=int):
+    return cast(os.environ.get(name, default))
+
+
+@tagged('-standard', 'insurance_benchmark', 'post_install', '-at_install')
+class TestInsurancePerformance(AccountTestInvoicingCommon):
+
+    POLICIES = _env_number('INSURANCE_BENCH_POLICIES', 5)
+    PRINCIPALS = _env_number('INSURANCE_BENCH_PRINCIPALS', 200)
+    DEPENDENTS = min(_env_number('INSURANCE_BENCH_DEPENDENTS', 3), 4)
+    BANDS = _env_number('INSURANCE_BENCH_BANDS', 6)
+    TOLERANCE = _env_number('INSURANCE_BENCH_TOLERANCE', 0.0, float) or None
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.insurer = cls.env['res.partner'].create({'name': 'Benchmark Insurer', 'is_insurer': True})
+        cls.customer = cls.env['res.partner'].create({'name': 'Benchmark Scheme Owner'})
+        cls.rate_table = cls.env['insurance.rate.table'].create({
+            'name': 'Benchmark Rates',
+            'insurer_id': cls.insurer.id,
+            'plan_code': 'BENCH',
+            'outpatient_limit': 100000,
+            'inpatient_limit': 1000000,
+            'outpatient_limit_upgrade_1': 150000,
+            'outpatient_limit_upgrade_2': 200000,
+            'band_ids': [
+                (0, 0, {
+                    'dependent_count': count,
+                    'inpatient_premium': 20000 + 15000 * count,
+                    'outpatient_premium': 8000 + 6000 * count,
+                })
+                for count in range(cls.BANDS)
+            ],
+        })
+        cls.commission_plan = cls.env['insurance.commission.plan'].create({
+            'name': 'Benchmark Commission',
+            'commission_rate': 10.0,
+        })
+        cls.policies = cls.env['insurance.policy'].create([
+            cls._prepare_policy_vals() for _index in range(cls.POLICIES)
+        ])
+        for policy in cls.policies:
+            cls._create_scheme(policy)
+        cls.env.flush_all()
+
+    @classmethod
+    def _prepare_policy_vals(cls):
+        return {
+            'partner_id': cls.customer.id,
+            'insurer_id': cls.insurer.id,
+            'rate_table_id': cls.rate_table.id,
+            'commission_plan_id': cls.commission_plan.id,
+            'payment_type': 'broker',
+        }
+
+    @classmethod
+    def _create_scheme(cls, policy):
+        Member = cls.env['insurance.policy.member']
+        principals = Member.create([
+            {
+                'name': f'{policy.name} Principal {index}',
+                'unique_identifier': f'{policy.name}-{index}',
+                'age': 40,
+                'relation_type': 'principal',
+                'policy_id': policy.id,
+                'state': 'pending',
+            }
+            for index in range(cls.PRINCIPALS)
+        ])
+        Member.create([
+            {
+                'name': f'{principal.name} Dependent {index}',
+                'unique_identifier': f'{principal.unique_identifier}-{index}',
+                'age': 10,
+                'relation_type': 'spouse' if index == 0 else 'child',
+                'principal_member_id': principal.id,
+                'policy_id': policy.id,
+                'state': 'pending',
+            }
+            for principal in principals
+            for index in range(cls.DEPENDENTS)
+        ])
+
+    @property
+    def lives(self):
+        return self.PRINCIPALS * (1 + self.DEPENDENTS)
+
+    @contextmanager
+    def assertFlowBudget(self, flow, lives):
+        """Time ``flow`` and count its queries, flushing pending writes inside the measure."""
+        fixed_queries, queries_per_100 = QUERY_BUDGETS[flow]
+        fixed_seconds, seconds_per_1000 = TIME_BUDGETS[flow]
+        tolerance = self.TOLERANCE or 1.0
+        max_queries = int((fixed_queries + queries_per_100 * lives / 100) * QUERY_MARGIN * tolerance)
+        max_seconds = (fixed_seconds + seconds_per_1000 * lives / 1000) * tolerance
+
+        self.env.flush_all()
+        self.env.invalidate_all()
+        start_queries = self.cr.sql_log_count
+        start = time.perf_counter()
+        yield
+        self.env.flush_all()
+        elapsed = time.perf_counter() - start
+        queries = self.cr.sql_log_count - start_queries
+
+        _logger.info(
+            "Benchmark %s: %s lives, %.3fs (budget %.3fs), %s queries (budget %s).",
+            flow, lives, elapsed, max_seconds, queries, max_queries,
+        )
+        self.assertLessEqual(queries, max_queries, f"{flow} ran {queries} queries for {lives} lives, budget is {max_queries}.")
+        if self.TOLERANCE:
+            self.assertLessEqual(elapsed, max_seconds, f"{flow} took {elapsed:.3f}s for {lives} lives, budget is {max_seconds:.3f}s.")
+
+    def test_compute_premium(self):
+        members = self.policies.member_ids
+        with self.assertFlowBudget('compute_premium', len(members)):
+            members._compute_premium()
+        self.assertTrue(all(members.mapped('premium')), "Every synthetic member should have a premium.")
+
+    def test_create_invoice(self):
+        with self.assertFlowBudget('create_invoice', self.lives * self.POLICIES):
+            self.policies.action_create_invoice()
+        self.assertEqual(len(self.policies.invoice_ids), self.POLICIES)
+
+    def test_sync_member_states(self):
+        self.policies.with_context(skip_member_sync=True).write({'payment_type': 'underwriter', 'state': 'active'})
+        with self.assertFlowBudget('sync_member_states', self.lives * self.POLICIES):
+            self.policies._sync_member_states()
+        self.assertEqual(set(self.policies.member_ids.mapped('state')), {'active'})
+
+    def test_import_members(self):
+        policy = self.env['insurance.policy'].create(self._prepare_policy_vals())
+        wizard = self.env['insurance.import.members'].with_context(active_id=policy.id).create({
+            'file': base64.b64encode(self._build_member_file(policy)),
+            'file_name': 'benchmark.xlsx',
+            'file_type': 'excel',
+        })
+        with self.assertFlowBudget('import_members', self.lives):
+            wizard.action_import()
+        self.assertEqual(len(policy.member_ids), self.lives)
+
+    def _build_member_file(self, policy):
+        """Excel member file of a synthetic scheme, in the layout of the import template."""
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(['Benchmark member file'])
+        sheet.append([
+            'MEMBER NAME*', 'PRIMARY MEMBER NAME*', 'MEM NUMBER*', 'RELATION*', 'DATE OF BIRTH',
+            'FAMILY SIZE', 'ID NUMBERS', 'PHONE NUMBER', 'EMAIL ADDRESS', 'GENDER',
+        ])
+        for index in range(self.PRINCIPALS):
+            principal_name = f'{policy.name} Import Principal {index}'
+            sheet.append([
+                principal_name, principal_name, f'IMP-{index}', 'SELF', datetime(1985, 1, 1),
+                'M', f'ID{index:08d}', None, None, 'Female',
+            ])
+            for dependent in range(self.DEPENDENTS):
+                sheet.append([
+                    f'{principal_name} Dependent {dependent}', principal_name, f'IMP-{index}-{dependent}',
+                    'Spouse' if dependent == 0 else 'Child', datetime(2015, 1, 1),
+                    f'M+{dependent + 1}', None, None, None, 'Male',
+                ])
+        output = io.BytesIO()
+        workbook.save(output)
+        return output.getvalue()
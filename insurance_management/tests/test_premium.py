@@ -0,0 +1,119 @@
+from datetime import datetime
+
+from odoo.tests import TransactionCase, tagged
+
+# Inpatient and outpatient premium per dependent count. Totals are 14000, 25000, 33000 and
+# 40000: the steps between bands differ, so every band difference is distinguishable.
+BANDS = {
+    0: (10000.0, 4000.0),
+    1: (18000.0, 7000.0),
+    2: (24000.0, 9000.0),
+    3: (29000.0, 11000.0),
+}
+
+
+@tagged('post_install', '-at_install')
+class TestMemberPremium(TransactionCase):
+    """Pin the batched premium engine to the per-member formula it replaced."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.insurer = cls.env['res.partner'].create({'name': 'Premium Insurer', 'is_insurer': True})
+        cls.customer = cls.env['res.partner'].create({'name': 'Premium Scheme Owner'})
+        cls.rate_table = cls.env['insurance.rate.table'].create({
+            'name': 'Premium Rates',
+            'insurer_id': cls.insurer.id,
+            'plan_code': 'PREM',
+            'outpatient_limit': 100000,
+            'inpatient_limit': 1000000,
+            'outpatient_limit_upgrade_1': 150000,
+            'outpatient_limit_upgrade_2': 200000,
+            'band_ids': [
+                (0, 0, {'dependent_count': count, 'inpatient_premium': inpatient, 'outpatient_premium': outpatient})
+                for count, (inpatient, outpatient) in BANDS.items()
+            ],
+        })
+        cls.commission_plan = cls.env['insurance.commission.plan'].create({
+            'name': 'Premium Commission',
+            'commission_rate': 10.0,
+        })
+
+    def _create_policy(self, **vals):
+        return self.env['insurance.policy'].create({
+            'partner_id': self.customer.id,
+            'insurer_id': self.insurer.id,
+            'rate_table_id': self.rate_table.id,
+            'commission_plan_id': self.commission_plan.id,
+            'payment_type': 'broker',
+            **vals,
+        })
+
+    def _create_family(self, policy, name, dependents, **vals):
+        Member = self.env['insurance.policy.member']
+        principal = Member.create({
+            'name': name,
+            'unique_identifier': name,
+            'relation_type': 'principal',
+            'policy_id': policy.id,
+            'state': 'pending',
+            **vals,
+        })
+        Member.create([
+            {
+                'name': f'{name} Dependent {index}',
+                'unique_identifier': f'{name}-{index}',
+                'relation_type': 'spouse' if index == 0 else 'child',
+                'principal_member_id': principal.id,
+                'policy_id': policy.id,
+                'state': 'pending',
+                **vals,
+            }
+            for index in range(dependents)
+        ])
+        return principal
+
+    def _expected_full_premium(self, member):
+        """Full premium of ``member`` as the former per-member computation priced it."""
+        def band_total(dependent_count):
+            band = self.rate_table.band_ids.filtered(lambda b: b.dependent_count == dependent_count)[:1]
+            return band.inpatient_premium + band.outpatient_premium
+
+        if not member.principal_member_id:
+            return band_total(0)
+        dependent_count = len(member.principal_member_id.linked_dependent_ids.filtered(lambda d: d.state != 'deleted'))
+        if dependent_count == 1:
+            return band_total(1) - band_total(0)
+        return band_total(dependent_count - 1) - band_total(dependent_count - 2)
+
+    def test_full_premiums(self):
+        policy = self._create_policy()
+        families = {
+            dependents: self._create_family(policy, f'Family {dependents}', dependents)
+            for dependents in range(4)
+        }
+        policy.member_ids._compute_premium()
+
+        for member in policy.member_ids:
+            self.assertAlmostEqual(member.premium, self._expected_full_premium(member), places=2, msg=member.name)
+        self.assertEqual(set(policy.member_ids.filtered(lambda m: not m.principal_member_id).mapped('premium')), {14000.0})
+        self.assertEqual(set(families[1].linked_dependent_ids.mapped('premium')), {11000.0})
+        self.assertEqual(set(families[2].linked_dependent_ids.mapped('premium')), {11000.0})
+        self.assertEqual(set(families[3].linked_dependent_ids.mapped('premium')), {8000.0})
+
+    def test_prorated_additions(self):
+        policy = self._create_policy(state='active', active_date=datetime(2026, 1, 1))
+        self.assertEqual(str(policy.end_date), '2027-01-01')
+        initial = self._create_family(policy, 'Initial', 1, creation_date=datetime(2026, 1, 1))
+        added = self._create_family(policy, 'Added', 2, creation_date=datetime(2026, 7, 2))
+        policy.member_ids._compute_premium()
+
+        # 183 of the 365 days of cover remain on 2 July
+        ratio = 183 / 365
+        self.assertEqual(initial.premium, 14000.0)
+        self.assertEqual(initial.linked_dependent_ids.premium, 11000.0)
+        self.assertAlmostEqual(added.premium, 14000.0 * ratio, places=2)
+        self.assertEqual(len(added.linked_dependent_ids), 2)
+        for dependent in added.linked_dependent_ids:
+            self.assertAlmostEqual(dependent.premium, 11000.0 * ratio, places=2)
+            self.assertAlmostEqual(dependent.premium, self._expected_full_premium(dependent) * ratio, places=2)
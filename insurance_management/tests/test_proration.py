@@ -0,0 +1,68 @@
+from datetime import date, datetime
+
+from odoo.tests import BaseCase, tagged
+
+from odoo.addons.insurance_management.tools.proration import prorate
+
+
+@tagged('insurance_proration')
+class TestProration(BaseCase):
+    """The proration is a pure function: these tests need no database."""
+
+    START = date(2026, 1, 1)
+    END = date(2027, 1, 1)
+
+    def test_empty_batch(self):
+        result = prorate([], [], [], [])
+        self.assertEqual(result.shape, (0,))
+
+    def test_half_period(self):
+        event = date(2026, 7, 2)
+        expected = 365.0 * (self.END - event).days / (self.END - self.START).days
+        self.assertAlmostEqual(prorate([365.0], [self.START], [self.END], [event])[0], expected)
+
+    def test_datetimes_are_truncated_to_their_date(self):
+        result = prorate([365.0], [datetime(2026, 1, 1, 23, 59)], [self.END], [datetime(2026, 7, 2, 0, 1)])
+        self.assertAlmostEqual(result[0], prorate([365.0], [self.START], [self.END], [date(2026, 7, 2)])[0])
+
+    def test_missing_dates_keep_the_full_amount(self):
+        result = prorate(
+            [100.0, 100.0, 100.0],
+            [False, self.START, self.START],
+            [self.END, None, self.END],
+            [date(2026, 7, 2), date(2026, 7, 2), False],
+        )
+        self.assertEqual(result.tolist(), [100.0, 100.0, 100.0])
+
+    def test_event_at_or_after_the_end(self):
+        result = prorate([100.0, 100.0], [self.START] * 2, [self.END] * 2, [self.END, date(2027, 3, 1)])
+        self.assertEqual(result.tolist(), [0.0, 0.0])
+
+    def test_event_before_the_start_is_capped(self):
+        result = prorate([100.0], [self.START], [self.END], [date(2025, 6, 1)])
+        self.assertEqual(result.tolist(), [100.0])
+
+    def test_empty_period(self):
+        result = prorate([100.0], [self.END], [self.START], [self.START])
+        self.assertEqual(result.tolist(), [0.0])
+
+    def test_locked_premium_identity(self):
+        """
+        Invoicing used to divide the creation-prorated premium by the creation ratio and
+        multiply it by the invoice ratio; the shared proration takes the premium from the
+        creation date to the invoice date instead. Both agree for midnight creation dates
+        and differ by at most one day's worth when the creation time truncates a day.
+        """
+        active = datetime(2026, 1, 1)
+        end = datetime(2027, 1, 1)
+        invoice_date = date(2026, 9, 15)
+        total_days = (end - active).days
+        covered_days = (end - datetime.combine(invoice_date, datetime.min.time())).days
+        for creation, tolerance_days in ((datetime(2026, 4, 1), 0), (datetime(2026, 4, 1, 15, 30), 1)):
+            creation_days = (end - creation).days
+            premium = 1200.0 * creation_days / total_days
+            old = premium / (creation_days / total_days) * (covered_days / total_days)
+            new = prorate([premium], [creation], [end], [invoice_date])[0]
+            self.assertLessEqual(abs(old - new), tolerance_days * premium * covered_days / creation_days ** 2 + 1e-9)
+            if not tolerance_days:
+                self.assertAlmostEqual(old, new)
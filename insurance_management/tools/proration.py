@@ -0,0 +1,46 @@
+"""
+Day-based proration shared by premium computation, invoicing and credit notes.
+
+A premium covering the period ``[start, end]`` is prorated at ``event`` (the date a member
+is added, invoiced or deleted) to the share of the period still remaining::
+
+    amount * (end - event) / (end - start)
+
+counted in whole days. Datetimes are truncated to their date. The remaining share is
+capped to the whole period and is zero once the event reaches the end of the period or the
+period is empty. When ``start`` or ``end`` is missing the amount is kept unprorated.
+"""
+from datetime import date, datetime
+
+import numpy as np
+
+
+def _to_days(values):
+    """Convert dates, datetimes or falsy values to a ``datetime64[D]`` array, falsy as NaT."""
+    return np.array([
+        (value.date() if isinstance(value, datetime) else value) if isinstance(value, date) else None
+        for value in values
+    ], dtype='datetime64[D]')
+
+
+def prorate(amounts, starts, ends, events):
+    """
+    Prorate every amount of a batch in one vectorised pass.
+
+    :param amounts: full premiums, one per row
+    :param starts: first day covered by each premium
+    :param ends: last day of cover of each premium
+    :param events: date at which each premium is prorated
+    :return: ``numpy.ndarray`` of the prorated amounts, in the order of ``amounts``
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    if not amounts.size:
+        return amounts
+    starts, ends, events = _to_days(starts), _to_days(ends), _to_days(events)
+    unprorated = np.isnat(starts) | np.isnat(ends) | np.isnat(events)
+    period = np.where(unprorated, 1, (ends - starts).astype('timedelta64[D]').astype(np.int64))
+    remaining = np.where(unprorated, 1, (ends - events).astype('timedelta64[D]').astype(np.int64))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.where((period > 0) & (remaining > 0), np.minimum(remaining / period, 1.0), 0.0)
+    return amounts * ratios
+
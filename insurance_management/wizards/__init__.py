@@ -1 +1 @@
-from . import quick_quote, import_members, quote_request_wizard
\ No newline at end of file
+from . import quick_quote, import_members, quote_request_wizard, commission_recompute
\ No newline at end of file
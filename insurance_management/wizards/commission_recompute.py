@@ -0,0 +1,26 @@
+from odoo import models, fields
+from odoo.exceptions import UserError
+
+
+class CommissionRecompute(models.TransientModel):
+    _name = 'insurance.commission.recompute'
+    _description = 'Recompute Commissions'
+
+    date_from = fields.Date(string='From', required=True)
+    date_to = fields.Date(string='To', required=True, default=fields.Date.today)
+    commission_plan_ids = fields.Many2many('insurance.commission.plan', string='Commission Plans',
+                                           help='Leave empty to recompute the commissions of every plan.')
+
+    def action_recompute(self):
+        self.ensure_one()
+        if self.date_from > self.date_to:
+            raise UserError('The start date must be before the end date.')
+        commissions = self.env['insurance.commission']._compute_commissions(self.date_from, self.date_to, self.commission_plan_ids)
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Recomputed Commissions',
+            'res_model': 'insurance.commission',
+            'view_mode': 'list,form',
+            'domain': [('id', 'in', commissions.ids)],
+            'target': 'current',
+        }
@@ -18,11 +18,10 @@ class QuickQuote(models.TransientModel):
             rec.inpatient_premium = rec.outpatient_premium = rec.total_premium = 0
             if rec.insurer_id:
                 rt = self.env['insurance.rate.table'].search([('insurer_id','=',rec.insurer_id.id)], limit=1)
-                band = rt.band_ids.filtered(lambda b: b.dependent_count == rec.dependent_count)[:1]
+                band = rt and rt._get_band_premiums().get(rec.dependent_count)
                 if band:
-                    rec.inpatient_premium = band.inpatient_premium
-                    rec.outpatient_premium = band.outpatient_premium
-                    rec.total_premium = band.inpatient_premium + band.outpatient_premium
+                    rec.inpatient_premium, rec.outpatient_premium = band
+                    rec.total_premium = sum(band)
 
     def action_print_quote(self):
         return self.env.ref('insurance_underwriting.action_report_insurance_quote').report_action(self)
\ No newline at end of file
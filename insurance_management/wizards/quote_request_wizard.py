@@ -42,44 +42,8 @@ class QuoteRequestWizard(models.TransientModel):
             raise ValidationError("At least one underwriter must be selected.")
         if not self.lead_id.risk_note_document:
             raise ValidationError("A risk note document is required to send quote requests.")
-        # Create lead.quote records
-        quotes = self.env['lead.quote']
-        attachment = False
-        if self.lead_id.risk_note_document:
-            try:
-                attachment = self.env['ir.attachment'].create({
-                    'name': self.lead_id.risk_note_document_filename or 'Risk_Note.pdf',
-                    'datas': self.lead_id.risk_note_document,
-                    'res_model': 'crm.lead',
-                    'res_id': self.lead_id.id,
-                    'type': 'binary',
-                })
-                _logger.info("Attachment created: ID %s, Name %s", attachment.id, attachment.name)
-            except Exception as e:
-                _logger.error("Failed to create attachment: %s", str(e))
-                raise ValidationError("Failed to create attachment for risk note document.")
-        for underwriter in self.underwriter_ids:
-            quote = self.env['lead.quote'].create({
-                'lead_id': self.lead_id.id,
-                'partner_id': underwriter.id,
-                'state': 'submitted',
-            })
-            quotes |= quote
-        # Send emails
-        template = self.env.ref('insurance_management.email_template_quote_request')
-        for quote in quotes:
-            portal_link = f"{self.env['ir.config_parameter'].sudo().get_param('web.base.url')}/innovus/quote/upload/{quote.access_token}"
-            email_values = {
-                'recipient_ids': [(6, 0, self.underwriter_ids.ids)],
-            }
-            if attachment:
-                email_values['attachment_ids'] = [(4, attachment.id)]
-            _logger.info("Sending email for quote ID %s, partner %s, portal_link %s", quote.id, quote.partner_id.name, portal_link)
-            template.with_context(portal_link=portal_link).send_mail(
-                quote.id,
-                force_send=True,
-                email_values=email_values
-            )
+        # Create lead.quote records and queue the emails
+        self.lead_id._send_quote_requests(self.underwriter_ids)
         # Notify BD handler
         bd_handler = self.lead_id.bd_handler_id or self.env.user
         self.lead_id.message_post(